@@ -3,28 +3,44 @@ import os
 
 from dateutil.tz import gettz
 from flask_bootstrap import Bootstrap5
-from flask import Flask, flash, request, redirect, render_template, session, url_for
+from flask import Flask, Response, flash, jsonify, request, redirect, render_template, session, url_for
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-import requests
 import timeago
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from src.streeteasymonitor.database import Database
+from src.streeteasymonitor.utils import get_base_url
 
+from .feed import ListingFeed
 from .forms import SearchForm
+from .jobs import JobQueue
 
-from main import main
 
+def create_app(db=None, jobs=None):
+    """Create the web app, backed by `db` or the default listings database.
 
-def create_app():
+    Searches run in the background on `jobs`, by default a `JobQueue` running `main.main`.
+    """
     paddaddy_base_url = 'https://paddaddy.app'
     offermate_lookup_api = 'https://offermate.app/unit_lookup'
+    listings_page_size = 200
+    max_listings_page_size = 1000
 
     app = Flask(__name__)
     bootstrap = Bootstrap5(app)
-    db = Database()
+    db = db or Database()
+
+    def run_search(params):
+        # Deferred so the web app starts without loading the scraper stack
+        from main import main
+
+        # Someone is waiting for the results - skip the random start delay of scheduled runs
+        return main(delay=False, **params)
+
+    jobs = jobs or JobQueue(run_search, db)
+    app.extensions['jobs'] = jobs
 
     # Configuration
     class FlaskConfig:
@@ -86,6 +102,33 @@ def create_app():
         datetime_formatted = f'{date_formatted} {time_formatted}'
 
         return time_ago if now - parsed < timedelta(hours=8) else datetime_formatted
+
+    def listing_event(rows):
+        """Payload of a listing feed event: new rows formatted like the tables, and the dashboard statistics."""
+        stats = db.get_statistics(days=1)
+        return {
+            'listings': [
+                {
+                    'id': listing['id'],
+                    'url': listing['url'],
+                    'address': listing['address'],
+                    'neighborhood': listing['neighborhood'],
+                    'price': usd(listing['price']) if listing['price'] is not None else '',
+                    'listed_by': listing['listed_by'] or 'N/A',
+                    'created_at': format_datetime(listing['created_at']),
+                }
+                for listing in rows
+            ],
+            'stats': {
+                'total_listings': stats['total_listings'],
+                'avg_price': usd(stats['avg_price']),
+                'neighborhoods_count': stats['neighborhoods_count'],
+            },
+        }
+
+    # One poller shared by every open page
+    feed = ListingFeed(db, listing_event)
+    app.extensions['listing_feed'] = feed
     
     @app.route('/login', methods=['GET', 'POST'])
     @limiter.limit("10 per minute")
@@ -119,26 +162,18 @@ def create_app():
     @login_required
     def dashboard():
         """Dashboard home page with statistics and recent listings."""
-        all_listings = db.get_listings_sorted()
-
-        # Calculate statistics
-        total_listings = len(all_listings)
-        recent_listings = [l for l in all_listings[:10]]  # Last 10
-
-        # Calculate average price if there are listings
-        avg_price = sum(l['price'] for l in all_listings) / total_listings if total_listings > 0 else 0
+        last_id = db.get_last_id()
+        recent_listings = db.get_listings(limit=10)  # Last 10
 
-        # Get unique neighborhoods
-        neighborhoods = set(l['neighborhood'] for l in all_listings if l['neighborhood'])
+        stats = db.get_statistics()
+        stats['recent_count'] = len(recent_listings)
 
-        stats = {
-            'total_listings': total_listings,
-            'avg_price': avg_price,
-            'neighborhoods_count': len(neighborhoods),
-            'recent_count': len(recent_listings)
-        }
-
-        return render_template('dashboard.html', stats=stats, recent_listings=recent_listings)
+        return render_template(
+            'dashboard.html',
+            stats=stats,
+            recent_listings=recent_listings,
+            feed_url=url_for('listing_feed', after=last_id),
+        )
 
     @app.route('/search', methods=['GET', 'POST'])
     @login_required
@@ -156,16 +191,9 @@ def create_app():
                 }
                 session['data'] = kwargs
 
-                try:
-                    main(**kwargs)
-                    flash('Search completed successfully!', 'success')
-                    return render_template('table.html', listings=db.get_listings_sorted())
-                except ValueError as e:
-                    flash(f'Validation error: {str(e)}', 'danger')
-                    return redirect(url_for('search'))
-                except Exception as e:
-                    flash(f'Search failed: {str(e)}', 'danger')
-                    return redirect(url_for('search'))
+                # The scrape runs in the background; the page polls `search_job` for its progress
+                job = jobs.submit(kwargs)
+                return render_template('job.html', job=job, listings=db.get_listings(limit=listings_page_size))
 
             flash('Invalid form submission', 'danger')
             return redirect(url_for('search'))
@@ -174,40 +202,69 @@ def create_app():
 
         return render_template(
             'search.html',
-            listings=db.get_listings_sorted(),
+            listings=db.get_listings(limit=listings_page_size),
             form=SearchForm(data=data),
         )
 
+    @app.route('/search/jobs/<job_id>')
+    @login_required
+    @limiter.exempt
+    def search_job(job_id):
+        """Status of a background search as JSON, with its new listings once it is done."""
+        job = jobs.status(job_id)
+        if job is None:
+            return jsonify({'id': job_id, 'status': 'unknown', 'error': 'Unknown or expired search'}), 404
+        return jsonify(job)
+
+    @app.route('/search/table')
+    @login_required
+    def search_table():
+        """The latest listings table, reloaded by the search page once a search finishes."""
+        return render_template('table.html', listings=db.get_listings(limit=listings_page_size))
+
     @app.route('/listings')
     @login_required
     def listings():
         """View all listings with filtering options."""
-        all_listings = db.get_listings_sorted()
-
         # Get filter parameters
-        neighborhood = request.args.get('neighborhood')
-        min_price = request.args.get('min_price', type=float)
-        max_price = request.args.get('max_price', type=float)
-
-        # Apply filters
-        filtered_listings = all_listings
-        if neighborhood:
-            filtered_listings = [l for l in filtered_listings if l['neighborhood'] == neighborhood]
-        if min_price is not None:
-            filtered_listings = [l for l in filtered_listings if l['price'] >= min_price]
-        if max_price is not None:
-            filtered_listings = [l for l in filtered_listings if l['price'] <= max_price]
-
-        # Get unique neighborhoods for filter dropdown
-        all_neighborhoods = sorted(set(l['neighborhood'] for l in all_listings if l['neighborhood']))
+        filters = {
+            'neighborhood': request.args.get('neighborhood'),
+            'min_price': request.args.get('min_price', type=float),
+            'max_price': request.args.get('max_price', type=float),
+            'since': request.args.get('since'),
+        }
+        limit = min(max(request.args.get('limit', listings_page_size, type=int), 1), max_listings_page_size)
+        # New listings are pushed into the unfiltered view only - they may not match the filters
+        last_id = db.get_last_id()
+        live = all(value is None or value == '' for value in filters.values())
+
+        # Apply filters in SQL
+        filtered_listings = db.get_listings(**filters, limit=limit)
+        total_count = db.count_listings(**filters)
 
         return render_template(
             'listings.html',
             listings=filtered_listings,
-            all_neighborhoods=all_neighborhoods,
-            current_neighborhood=neighborhood,
-            current_min_price=min_price,
-            current_max_price=max_price
+            total_count=total_count,
+            all_neighborhoods=db.get_neighborhoods(),
+            current_neighborhood=filters['neighborhood'],
+            current_min_price=filters['min_price'],
+            current_max_price=filters['max_price'],
+            current_since=filters['since'],
+            limit=limit,
+            feed_url=url_for('listing_feed', after=last_id) if live else None,
+        )
+
+    @app.route('/listings/feed')
+    @login_required
+    @limiter.exempt
+    def listing_feed():
+        """Server-sent events with the listings inserted after `after`, or after the browser's Last-Event-ID."""
+        after = request.headers.get('Last-Event-ID', type=int) or request.args.get('after', type=int)
+        return Response(
+            feed.stream(after),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
         )
     
 
@@ -219,12 +276,14 @@ def create_app():
         if not url.startswith('http'):
             url = 'https://' + url
 
-        # Only allow StreetEasy URLs
-        if 'streeteasy.com' not in url:
+        # Only allow StreetEasy URLs (or the stand-in STREETEASY_BASE_URL points at)
+        if 'streeteasy.com' not in url and not url.startswith(f'{get_base_url()}/'):
             flash('Invalid URL - only StreetEasy links are allowed', 'danger')
             return redirect(url_for('dashboard'))
 
         try:
+            import requests
+
             params = {'q': url}
             r = requests.get(offermate_lookup_api, params=params, timeout=5)
             json = r.json()
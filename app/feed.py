@@ -0,0 +1,133 @@
+import json
+import queue
+import threading
+import time
+
+
+class ListingFeed:
+    """Broadcasts newly inserted listings to every open dashboard as server-sent events.
+
+    One background thread polls the database's change counter (`Database.data_version`) and only queries for new
+    rows after it moved, so the cost is one cheap poll per `interval` however many tabs are subscribed. Each batch
+    of new rows is serialized once and shared by all subscribers. The thread runs only while someone is subscribed.
+
+    Attributes:
+        interval (float): Seconds between polls of the change counter.
+        heartbeat (float): Seconds of silence after which a subscriber is sent a keep-alive comment.
+        batch_size (int): Maximum listings sent in one event.
+        backlog (int): Events buffered per subscriber; a subscriber too slow to keep up misses the excess.
+        lifetime (float): Seconds after which a stream ends; the browser reconnects and catches up from the last
+            event it received, so a web worker thread is never held by one tab indefinitely.
+    """
+
+    interval = 2.0
+    heartbeat = 15.0
+    batch_size = 200
+    backlog = 100
+    lifetime = 5 * 60.0
+
+    def __init__(self, db, serialize=None):
+        """Initialize the feed.
+
+        Args:
+            db (Database): Database the listings are inserted into.
+            serialize (Callable[[list[dict]], dict], optional): Builds the event payload from new listings;
+                defaults to `{'listings': rows}`.
+        """
+        self.db = db
+        self.serialize = serialize or (lambda rows: {'listings': rows})
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.thread = None
+        self.last_id = None
+
+    @staticmethod
+    def event(last_id, payload):
+        return f'id: {last_id}\nevent: listings\ndata: {json.dumps(payload, default=str)}\n\n'
+
+    def subscribe(self):
+        """Register a subscriber queue, starting the poller if it isn't running."""
+        subscriber = queue.Queue(maxsize=ListingFeed.backlog)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if self.thread is None:
+                # Subscribers catch up on anything older themselves (see `stream`)
+                self.last_id = self.db.get_last_id()
+                self.thread = threading.Thread(target=self.poll, name='listing-feed', daemon=True)
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def poll(self):
+        version = None
+        while True:
+            time.sleep(ListingFeed.interval)
+            with self.lock:
+                if not self.subscribers:
+                    self.thread = None
+                    break
+
+            try:
+                current = self.db.data_version()
+                if current == version:
+                    continue
+                version = current
+                rows = self.db.get_listings_after(self.last_id, ListingFeed.batch_size)
+                while rows:
+                    self.last_id = rows[-1]['id']
+                    self.broadcast(self.last_id, ListingFeed.event(self.last_id, self.serialize(rows)))
+                    if len(rows) < ListingFeed.batch_size:
+                        break
+                    rows = self.db.get_listings_after(self.last_id, ListingFeed.batch_size)
+            except Exception as e:
+                print(f'Listing feed poll failed: {e}')
+
+        self.db.close()
+
+    def broadcast(self, last_id, message):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((last_id, message))
+            except queue.Full:
+                pass
+
+    def stream(self, after=None):
+        """Yield server-sent events for one subscriber until the client disconnects or `lifetime` runs out.
+
+        Args:
+            after (int, optional): Row id of the newest listing the client already has; anything newer that was
+                inserted before the subscription is sent first.
+        """
+        subscriber = self.subscribe()
+        try:
+            yield 'retry: 5000\n\n'
+            sent = after or 0
+            if after is not None:
+                # Catch up on rows inserted between rendering the page (or a dropped connection) and subscribing
+                rows = self.db.get_listings_after(after, ListingFeed.batch_size)
+                while rows:
+                    sent = rows[-1]['id']
+                    yield ListingFeed.event(sent, self.serialize(rows))
+                    if len(rows) < ListingFeed.batch_size:
+                        break
+                    rows = self.db.get_listings_after(sent, ListingFeed.batch_size)
+                self.db.close()
+
+            closes_at = time.monotonic() + ListingFeed.lifetime
+            while time.monotonic() < closes_at:
+                try:
+                    last_id, message = subscriber.get(timeout=ListingFeed.heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                # Skip what the catch-up already covered; the page ignores any rows it shows twice
+                if last_id > sent:
+                    sent = last_id
+                    yield message
+        finally:
+            self.unsubscribe(subscriber)
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time
+import uuid
+
+
+class JobQueue:
+    """Runs searches submitted from the web app on a background worker pool, so requests return immediately.
+
+    Jobs are recorded in the database, so a status poll can be answered by any web worker process, not only the
+    one running the search. Submitting the same parameters as a search that is still queued or running returns that
+    search's job instead of starting another one. Finished jobs are kept for `Database.job_ttl` seconds.
+    """
+
+    def __init__(self, run, db, max_workers=1):
+        """Initialize the queue.
+
+        Args:
+            run (Callable[[dict], Optional[list]]): Runs one search with the given parameters and returns its new
+                listings, or None if the search was skipped because another run was in progress.
+            db (Database): Database holding the jobs.
+            max_workers (int): Searches running at once. Runs are serialized machine-wide anyway, so one is enough.
+        """
+        self.run = run
+        self.db = db
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='search-job')
+
+    @staticmethod
+    def key(params):
+        return json.dumps(params, sort_keys=True, default=str)
+
+    def submit(self, params):
+        """Queue a search, or return the queued or running job with identical parameters.
+
+        Returns:
+            dict: The job's status, as returned by `status`.
+        """
+        job_id, created = self.db.submit_job(uuid.uuid4().hex, JobQueue.key(params), params)
+        if created:
+            self.pool.submit(self.execute, job_id, params)
+        return self.status(job_id)
+
+    def execute(self, job_id, params):
+        self.db.start_job(job_id)
+        try:
+            listings = self.run(params)
+        except Exception as e:
+            self.db.finish_job(job_id, 'failed', error=str(e))
+            return
+        if listings is None:
+            self.db.finish_job(job_id, 'skipped', error='Another run is in progress')
+        else:
+            self.db.finish_job(job_id, 'done', listings=listings)
+
+    def status(self, job_id):
+        """Return a job's status and, once it is done, its new listings; None for an unknown or expired job."""
+        job = self.db.get_job(job_id)
+        if job is None:
+            return None
+
+        now = time.time()
+        described = {
+            'id': job['id'],
+            'status': job['status'],
+            'params': job['params'],
+            'elapsed': (job['finished_at'] or now) - (job['started_at'] or now),
+            'error': job['error'],
+        }
+        if 'position' in job:
+            described['position'] = job['position']
+        if job['listings'] is not None:
+            described['count'] = len(job['listings'])
+            described['listings'] = job['listings']
+        return described
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -27,4 +27,93 @@ document.addEventListener('DOMContentLoaded', function () {
         form.classList.add('was-validated');
     }, false);
 
-});
\ No newline at end of file
+});
+
+// Searches run in the background - poll the job until it finishes, then reload the listings table
+function pollSearchJob(element) {
+    const message = element.querySelector('.job-message');
+
+    fetch(element.dataset.statusUrl, { headers: { 'Accept': 'application/json' } })
+        .then(response => response.json())
+        .then(job => {
+            if (job.status === 'queued' || job.status === 'running') {
+                message.textContent = job.status === 'queued'
+                    ? `Search queued (position ${job.position})...`
+                    : `Searching... ${Math.round(job.elapsed)} s`;
+                setTimeout(() => pollSearchJob(element), 2000);
+                return;
+            }
+
+            element.querySelector('.spinner-border')?.remove();
+            if (job.status === 'done') {
+                element.className = 'alert alert-success';
+                message.textContent = `Search completed - ${job.count} new listing(s)`;
+                htmx.ajax('GET', element.dataset.tableUrl, '#job-table');
+            } else {
+                element.className = job.status === 'skipped' ? 'alert alert-warning' : 'alert alert-danger';
+                message.textContent = `Search failed: ${job.error}`;
+            }
+        })
+        .catch(() => setTimeout(() => pollSearchJob(element), 5000));
+}
+
+document.addEventListener('htmx:afterSwap', function (event) {
+    const job = event.detail.target.querySelector('#search-job');
+    if (job) {
+        pollSearchJob(job);
+    }
+});
+
+
+// Patch listings pushed by the server into the table as they are inserted, newest first
+function connectListingFeed(element) {
+    const source = new EventSource(element.dataset.listingFeed);
+
+    source.addEventListener('listings', function (event) {
+        const data = JSON.parse(event.data);
+        if ('reload' in element.dataset) {
+            window.location.reload();
+            return;
+        }
+
+        const columns = element.dataset.columns.split(',');
+        data.listings.forEach(listing => {
+            if (element.querySelector(`tr[data-id="${listing.id}"]`)) {
+                return;
+            }
+            const row = document.createElement('tr');
+            row.dataset.id = listing.id;
+            row.classList.add('table-success');
+            columns.forEach(column => {
+                const cell = document.createElement('td');
+                if (column === 'address') {
+                    const link = document.createElement('a');
+                    link.href = '/' + listing.url;
+                    link.target = '_blank';
+                    link.textContent = listing.address;
+                    cell.appendChild(link);
+                } else {
+                    cell.textContent = listing[column];
+                }
+                row.appendChild(cell);
+            });
+            element.prepend(row);
+        });
+
+        const limit = parseInt(element.dataset.limit || '0', 10);
+        while (limit && element.rows.length > limit) {
+            element.deleteRow(-1);
+        }
+
+        document.querySelectorAll('[data-feed-shown]').forEach(count => count.textContent = element.rows.length);
+        document.querySelectorAll('[data-stat]').forEach(stat => {
+            if (stat.dataset.stat in data.stats) {
+                stat.textContent = data.stats[stat.dataset.stat];
+            }
+        });
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('[data-listing-feed]').forEach(connectListingFeed);
+});
@@ -0,0 +1,68 @@
+"""Measure the cold import time of the scraper and web entry points, and of loading the area index.
+
+Each module is imported in a fresh interpreter with `-X importtime`, so caches from earlier imports never help.
+Run from the repository root:
+
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['main', 'app', 'src.streeteasymonitor.search', 'src.streeteasymonitor.database']
+
+
+def import_time(module):
+    """Return the cumulative import time of `module` in a fresh interpreter, in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # The last line reports the requested module itself: "import time: self | cumulative | name"
+    cumulative = result.stderr.strip().splitlines()[-1].split('|')[1]
+    return int(cumulative) / 1000
+
+
+def area_load_times(repeat):
+    """Return the time to load area names from the precompiled index and from the full areas.json, in milliseconds."""
+    from src.streeteasymonitor import areas
+
+    def timed(load):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            load()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    def load_index():
+        areas.get_area_index.cache_clear()
+        areas.get_area_map()
+
+    def load_full():
+        with open(areas.AREAS_PATH) as f:
+            {area['name']: area['id'] for area in json.load(f)}
+
+    return timed(load_index), timed(load_full)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='samples per measurement (default: 5)')
+    args = parser.parse_args()
+
+    for module in MODULES:
+        samples = [import_time(module) for _ in range(args.repeat)]
+        print(f'{module:>32}: {statistics.median(samples):8.1f} ms (median of {args.repeat})')
+
+    index_ms, full_ms = area_load_times(args.repeat)
+    print(f'{"area index":>32}: {index_ms:8.2f} ms (areas.json with boundaries: {full_ms:.2f} ms)')
+
+
+if __name__ == '__main__':
+    main()
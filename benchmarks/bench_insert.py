@@ -0,0 +1,57 @@
+"""Compare per-row `insert_new_listing` calls with one bulk `insert_listings` transaction.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_insert --rows 30 --batches 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src.streeteasymonitor.database import Database
+
+
+def make_listings(count, offset=0):
+    return [
+        {
+            'listing_id': f'bench-building-{i}_{i % 10}a',
+            'url': f'https://streeteasy.com/building/bench-building-{i}/{i % 10}a',
+            'price': 2500 + i % 2000,
+            'address': f'{i} Bench Street #{i % 10}A',
+            'neighborhood': 'Park Slope',
+            'listed_by': 'Bench Realty',
+            'is_featured': False,
+        }
+        for i in range(offset, offset + count)
+    ]
+
+
+def bench(label, insert, rows, batches):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.sqlite3'))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for batch in range(batches):
+                insert(db, make_listings(rows, offset=batch * rows))
+        elapsed = time.perf_counter() - start
+    total = rows * batches
+    print(f'{label:>10}: {total} rows in {elapsed:.3f} s ({total / elapsed:,.0f} rows/s)')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=30, help='listings per run (default: 30)')
+    parser.add_argument('--batches', type=int, default=20, help='number of runs to simulate (default: 20)')
+    args = parser.parse_args()
+
+    per_row = bench('per-row', lambda db, listings: [db.insert_new_listing(l) for l in listings], args.rows, args.batches)
+    bulk = bench('bulk', lambda db, listings: db.insert_listings(listings), args.rows, args.batches)
+    print(f'{"speedup":>10}: {per_row / bulk:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Drive concurrent monitor runs against the local stand-in server and report throughput, retries and sleeps.
+
+Every knob of the fetch loop can be set from the command line, so backoff and concurrency settings can be
+compared with numbers. Run from the repository root:
+
+    python -m benchmarks.load --runs 40 --workers 8 --throttle-rate 0.1 --request-delay 0.1 --retry-delay 0.2
+"""
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.streeteasymonitor.config import Config
+from src.streeteasymonitor.database import Database
+from src.streeteasymonitor.monitor import Monitor
+from src.streeteasymonitor.ratelimit import AdaptiveRateLimiter, RateLimiter
+from src.streeteasymonitor.search import Search
+
+from .standin import StandInServer
+
+
+def merge_stats(total, stats):
+    """Add one search's `Search.stats` into the running totals."""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            for name, amount in value.items():
+                total[key][name] += amount
+        else:
+            total[key] += value
+
+
+def run_load(server, args):
+    """Run `args.runs` searches on `args.workers` threads and return the report."""
+    params = {**Config().get_search_params(), 'areas': ['Brooklyn'], 'max_pages': args.pages}
+    totals = defaultdict(float, {
+        'statuses': Counter(), 'branches': defaultdict(float), 'sleeps': defaultdict(float),
+    })
+    failures = []
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=args.workers)
+    session.mount('http://', adapter)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'load.sqlite3'))
+        db.create_table()
+
+        def make_limiter(name):
+            if args.adaptive:
+                return AdaptiveRateLimiter(Search.request_delay, key=name, db_path=os.path.join(tmp, 'ratelimit.sqlite3'))
+            return RateLimiter(Search.request_delay)
+
+        shared_limiter = make_limiter('shared')
+
+        def run_one(i):
+            limiter = shared_limiter if args.shared_limiter else make_limiter(f'search-{i}')
+            with Monitor(db=db, session=session, limiter=limiter, **params) as monitor:
+                try:
+                    monitor.run()
+                except Exception as e:
+                    failures.append(repr(e))
+                return monitor.search.stats if hasattr(monitor, 'search') else None
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for stats in pool.map(run_one, range(args.runs)):
+                if stats:
+                    merge_stats(totals, stats)
+        elapsed = time.perf_counter() - start
+        db.close()
+    session.close()
+
+    served = server.stats['requests']
+    return {
+        'settings': vars(args),
+        'wall_seconds': elapsed,
+        'searches': args.runs,
+        'failed_searches': len(failures),
+        'requests': int(totals['requests']),
+        'requests_per_second': served / elapsed if elapsed else 0.0,
+        'searches_per_minute': args.runs / elapsed * 60 if elapsed else 0.0,
+        'statuses': {str(code): count for code, count in sorted(totals['statuses'].items())},
+        'branch_seconds': dict(totals['branches']),
+        'sleep_seconds': dict(totals['sleeps']),
+        'wasted_sleeps': int(totals['wasted_sleeps']),
+        'wasted_sleep_seconds': totals['wasted_sleep_seconds'],
+        'server': dict(server.stats),
+    }
+
+
+def print_report(report):
+    print(f'{report["searches"]} searches ({report["failed_searches"]} failed) in {report["wall_seconds"]:.2f} s')
+    print(f'  {report["requests"]} requests, {report["requests_per_second"]:.1f} req/s, '
+          f'{report["searches_per_minute"]:.1f} searches/min')
+    print(f'  statuses: {report["statuses"]}')
+    print(f'  server early retries (inside Retry-After): {report["server"].get("early_retries", 0)}')
+    print('  time per fetch branch (s, summed over threads):')
+    for name, seconds in sorted(report['branch_seconds'].items(), key=lambda item: -item[1]):
+        print(f'    {name:<14} {seconds:9.2f}')
+    print('  sleeps (s, summed over threads):')
+    for name, seconds in sorted(report['sleep_seconds'].items(), key=lambda item: -item[1]):
+        print(f'    {name:<14} {seconds:9.2f}')
+    print(f'  wasted sleeps: {report["wasted_sleeps"]} ({report["wasted_sleep_seconds"]:.2f} s before requests that failed anyway)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='searches to run (default: 20)')
+    parser.add_argument('--workers', type=int, default=4, help='searches running at once (default: 4)')
+    parser.add_argument('--pages', type=int, default=2, help='results pages per search (default: 2)')
+    parser.add_argument('--latency', type=float, default=0.05, help='server seconds per response (default: 0.05)')
+    parser.add_argument('--jitter', type=float, default=0.05, help='extra random server seconds (default: 0.05)')
+    parser.add_argument('--forbidden-rate', type=float, default=0.0, help='share of page requests answered with 403')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of page requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=2, help='Retry-After seconds sent with a 429 (default: 2)')
+    parser.add_argument('--request-delay', type=float, default=Search.request_delay, help='Search.request_delay')
+    parser.add_argument('--retry-delay', type=float, default=Search.retry_delay, help='Search.retry_delay')
+    parser.add_argument('--refresh-delay', type=float, default=Search.refresh_delay, help='Search.refresh_delay')
+    parser.add_argument('--max-retries', type=int, default=Search.max_retries, help='Search.max_retries')
+    parser.add_argument('--per-search-limiter', dest='shared_limiter', action='store_false',
+                        help='give every search its own rate limiter instead of sharing one')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='use the adaptive SQLite-backed limiter and cooldown instead of the fixed one')
+    parser.add_argument('--max-cooldown-wait', type=float, default=Search.max_cooldown_wait,
+                        help='Search.max_cooldown_wait')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    args = parser.parse_args()
+
+    Search.request_delay = args.request_delay
+    Search.retry_delay = args.retry_delay
+    Search.refresh_delay = args.refresh_delay
+    Search.max_retries = args.max_retries
+    Search.max_cooldown_wait = args.max_cooldown_wait
+
+    server = StandInServer(
+        latency=args.latency, jitter=args.jitter, forbidden_rate=args.forbidden_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, seed=args.seed,
+    )
+    with server:
+        os.environ['STREETEASY_BASE_URL'] = server.url
+        report = run_load(server, args)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
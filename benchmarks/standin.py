@@ -0,0 +1,174 @@
+"""A local stand-in for StreetEasy serving the fixture pages, with configurable latency and blocking.
+
+Point the monitor at it with STREETEASY_BASE_URL. To run it on its own:
+
+    python -m benchmarks.standin --port 8765 --latency 0.2 --throttle-rate 0.1 --retry-after 5
+    STREETEASY_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+import argparse
+from collections import Counter
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from .suite import load_fixture
+
+
+class StandInServer:
+    """Serves the homepage, results pages and listing pages from the benchmark fixtures.
+
+    Results and listing requests can be answered with 403 or 429 at random. A 429 carries a `Retry-After`
+    header, and any request from a client that arrives before its Retry-After window has passed is counted as
+    an early retry.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, forbidden_rate=0.0, throttle_rate=0.0,
+                 retry_after=5, etag=True, seed=None):
+        """Configure the server; `start` begins serving.
+
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on, or 0 for any free port.
+            latency (float): Seconds each response is delayed.
+            jitter (float): Up to this many extra seconds of random delay per response.
+            forbidden_rate (float): Share of results and listing requests answered with 403.
+            throttle_rate (float): Share of results and listing requests answered with 429.
+            retry_after (int): Seconds sent in the `Retry-After` header of a 429.
+            etag (bool): Send an ETag with results pages and answer matching conditional requests with 304.
+            seed (int, optional): Seed for reproducible blocking and jitter.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.forbidden_rate = forbidden_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.etag = etag
+        self.random = random.Random(seed)
+
+        self.results = load_fixture('results.html')
+        self.listing = load_fixture('listing.html')
+        self.pages = {}
+
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.blocked_until = {}
+
+        self.httpd = ThreadingHTTPServer((host, port), self.handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args, **kwargs):
+        self.stop()
+
+    def results_page(self, page):
+        """Return the body and ETag of a results page; later pages list different listings than the first."""
+        if page not in self.pages:
+            body = self.results if page <= 1 else self.results.replace(b'-brooklyn/', b'-brooklyn-p%d/' % page)
+            self.pages[page] = body, '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        return self.pages[page]
+
+    def respond(self, path, headers, client):
+        """Decide the response to a request: `(delay, status, headers, body)`."""
+        with self.lock:
+            self.stats['requests'] += 1
+            now = time.monotonic()
+            if self.blocked_until.get(client, 0) > now:
+                self.stats['early_retries'] += 1
+
+            delay = self.latency + self.random.random() * self.jitter
+            roll = self.random.random()
+
+        if path.startswith('/for-rent/nyc/') or path.startswith('/building/'):
+            if roll < self.forbidden_rate:
+                return delay, 403, {}, b'Forbidden'
+            if roll < self.forbidden_rate + self.throttle_rate:
+                with self.lock:
+                    self.blocked_until[client] = now + self.retry_after
+                return delay, 429, {'Retry-After': str(self.retry_after)}, b'Too Many Requests'
+
+        if path.startswith('/for-rent/nyc/'):
+            body, etag = self.results_page(int(parse_qs(urlsplit(path).query).get('page', ['1'])[0]))
+            if self.etag and headers.get('If-None-Match') == etag:
+                return delay, 304, {'ETag': etag}, b''
+            return delay, 200, {'ETag': etag} if self.etag else {}, body
+        if path.startswith('/building/'):
+            return delay, 200, {}, self.listing
+        if path in ('/', '/for-rent/nyc'):
+            return delay, 200, {'Set-Cookie': 'se_session=standin; Path=/'}, b'<html><body>StreetEasy</body></html>'
+        return delay, 404, {}, b'Not Found'
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                delay, status, headers, body = server.respond(self.path, self.headers, self.client_address[0])
+                if delay:
+                    time.sleep(delay)
+                with server.lock:
+                    server.stats[f'status_{status}'] += 1
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra random seconds per response')
+    parser.add_argument('--forbidden-rate', type=float, default=0.0, help='share of page requests answered with 403')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of page requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=5, help='Retry-After seconds sent with a 429')
+    parser.add_argument('--no-etag', action='store_true', help='never answer 304 Not Modified')
+    args = parser.parse_args()
+
+    server = StandInServer(
+        args.host, args.port, args.latency, args.jitter, args.forbidden_rate, args.throttle_rate,
+        args.retry_after, etag=not args.no_etag,
+    )
+    print(f'Serving fixtures at {server.url} (Ctrl+C to stop)')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(dict(server.stats))
+
+
+if __name__ == '__main__':
+    main()
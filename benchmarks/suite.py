@@ -0,0 +1,318 @@
+"""Time the scrape pipeline offline - parsing, filtering, the database, the email body and the web routes.
+
+Everything runs against the HTML fixtures in `benchmarks/fixtures` and temporary databases; no request leaves
+the machine. The fixtures are synthetic pages reproducing the StreetEasy markup the parser relies on (card
+wrappers, unit links, price spans, "in <neighborhood>" and "Listing by" text, og:image and a full address with
+ZIP), padded with navigation, footer and an embedded JSON blob to a realistic size. A few result cards carry
+coordinates (`GEO_CARDS`), two of them in a different neighborhood than their text names.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --rows 1000,100000,1000000 --compare before.json
+"""
+import argparse
+import contextlib
+from datetime import datetime, UTC
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.streeteasymonitor.config import Config
+from src.streeteasymonitor.database import Database
+from src.streeteasymonitor.email_notifier import EmailNotifier
+from src.streeteasymonitor.search import Parser
+
+from .bench_insert import make_listings
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+GROUPS = ('parser', 'filter', 'database', 'email', 'app')
+
+# Results fixture cards exposing coordinates, and whether a Brooklyn search keeps them
+GEO_CARDS = {
+    '100-5th-avenue-brooklyn_1a': True,  # data-lat/data-lng in Park Slope, as the text says
+    '117-bergen-street-brooklyn_2b': True,  # schema.org microdata in Bedford-Stuyvesant
+    '168-union-street-brooklyn_5a': True,  # text says Astoria, coordinates are in Gowanus
+    '202-classon-avenue-brooklyn_1c': False,  # text says Clinton Hill, coordinates are in Midtown
+}
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def measure(fn, repeat, per=1):
+    """Run `fn` `repeat` times (after one warm-up call) and summarize the wall time per call and per unit."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    median = statistics.median(samples)
+    return {
+        'median_ms': median * 1000,
+        'min_ms': min(samples) * 1000,
+        'per_unit_us': median / per * 1e6,
+        'units': per,
+        'repeat': repeat,
+    }
+
+
+class KnownIds:
+    """Stands in for the database in parser benchmarks, reporting a fixed set of IDs as already stored."""
+
+    def __init__(self, ids=()):
+        self.ids = set(ids)
+
+    def get_known_ids(self, candidate_ids):
+        return self.ids.intersection(candidate_ids)
+
+    def get_rejected_ids(self, scope, candidate_ids):
+        return set()
+
+
+class FixtureSession:
+    """Stands in for the notifier's HTTP session, answering every listing page request with the fixture."""
+
+    class Response:
+        status_code = 200
+
+        def __init__(self, content):
+            self.content = content
+
+    def __init__(self, content):
+        self.content = content
+
+    def get(self, url, timeout=None):
+        return FixtureSession.Response(self.content)
+
+
+def bench_parser(results, repeat):
+    content = load_fixture('results.html')
+    kwargs = {'areas': ['Brooklyn']}
+    cards = Parser(content, KnownIds(), kwargs).card_count or len(Parser.scan_ids(content))
+
+    results['parser.page_new'] = measure(lambda: Parser(content, KnownIds(), kwargs).listings, repeat, per=cards)
+    known = KnownIds(Parser.scan_ids(content))
+    results['parser.page_known'] = measure(lambda: Parser(content, known, kwargs).listings, repeat, per=cards)
+    results['parser.scan_ids'] = measure(lambda: Parser.scan_ids(content), repeat, per=cards)
+
+    parser = Parser(content, KnownIds(), kwargs)
+    check_geometry(parser)
+
+    from src.streeteasymonitor.geo import get_area_geometry
+
+    geometry = get_area_geometry()
+    points = [(listing['latitude'], listing['longitude']) for listing in parse_cards(parser) if 'latitude' in listing]
+    results['parser.locate'] = measure(lambda: geometry.locate(points), repeat, per=len(points))
+
+
+def parse_cards(parser):
+    """Return every card of a parsed page extracted, before filtering."""
+    cards = parser.soup.find_all('li', class_=Parser.card_pattern, recursive=False)
+    return [listing for listing in map(parser.parse, cards) if listing]
+
+
+def check_geometry(parser):
+    """Fail unless the cards with coordinates were placed by the area geometry, overriding their neighborhood text."""
+    accepted = {listing['listing_id'] for listing in parser.listings}
+    kept = {listing_id: listing_id in accepted for listing_id in GEO_CARDS}
+    if set(parser.located) != set(GEO_CARDS) or kept != GEO_CARDS:
+        raise RuntimeError(f'Geometry filter: located {sorted(parser.located)}, kept {kept}, expected {GEO_CARDS}')
+
+
+def bench_filter(results, repeat):
+    parser = Parser(load_fixture('results.html'), KnownIds(), {'areas': ['Brooklyn']})
+    # Placing the cards with coordinates puts them on the geometry branch of the area filter
+    check_geometry(parser)
+    listings = parse_cards(parser) * 10
+
+    def run():
+        for listing in listings:
+            parser.filter(listing)
+
+    results['filter.default_rules'] = measure(run, repeat, per=len(listings))
+
+    # A production-sized blocklist: hundreds of brokers and addresses
+    original = Config.filters
+    Config.filters = {
+        'is_featured': [True],
+        'address': [f'{n} Blocked Street' for n in range(300)],
+        'neighborhood': [f'Blocked Hood {n}' for n in range(50)],
+        'listed_by': [f'Blocked Realty {n}' for n in range(300)],
+    }
+    try:
+        parser = Parser(load_fixture('results.html'), KnownIds(), {'areas': ['Brooklyn']})
+        parser.listings  # Places the cards with coordinates, as above
+        results['filter.650_rules'] = measure(run, repeat, per=len(listings))
+    finally:
+        Config.filters = original
+
+
+def build_database(path, rows):
+    db = Database(path)
+    db.create_table()
+    chunk = 50000
+    for offset in range(0, rows, chunk):
+        db.insert_listings(make_listings(min(chunk, rows - offset), offset=offset))
+    return db
+
+
+def size_label(rows):
+    return f'{rows // 1000000}M' if rows >= 1000000 and rows % 1000000 == 0 else f'{rows // 1000}k'
+
+
+def bench_database(results, repeat, rows, db):
+    label = size_label(rows)
+    batch = iter(range(repeat + 1))
+    results[f'database.{label}.insert_30'] = measure(
+        lambda: db.insert_listings(make_listings(30, offset=rows + next(batch) * 30)), repeat, per=30
+    )
+    page_ids = [f'bench-building-{i}_{i % 10}a' for i in range(rows - 15, rows + 15)]
+    results[f'database.{label}.get_known_ids_30'] = measure(lambda: db.get_known_ids(page_ids), repeat, per=30)
+    results[f'database.{label}.get_listings_200'] = measure(lambda: db.get_listings(limit=200), repeat, per=200)
+    results[f'database.{label}.get_listings_filtered'] = measure(
+        lambda: db.get_listings(neighborhood='Park Slope', min_price=3000, limit=200), repeat
+    )
+    results[f'database.{label}.get_statistics'] = measure(db.get_statistics, repeat)
+
+
+def bench_email(results, repeat):
+    notifier = EmailNotifier({
+        'server': 'localhost', 'port': 0, 'username': '', 'password': '', 'recipient': '', 'maps_api_key': 'bench',
+    })
+    notifier._session = FixtureSession(load_fixture('listing.html'))
+    notifier._throttle = lambda url, timeout=None: True
+    listings = make_listings(30)
+
+    results['email.format_html_30'] = measure(lambda: notifier._format_html_email(listings), repeat, per=30)
+
+
+def bench_app(results, repeat, rows, db):
+    label = size_label(rows)
+    os.environ.setdefault('ADMIN_PASSWORD', 'bench')
+
+    from app import create_app
+
+    app = create_app(db)
+    app.config.update(WTF_CSRF_ENABLED=False, RATELIMIT_ENABLED=False)
+    client = app.test_client()
+    client.post('/login', data={'username': app.config['ADMIN_USERNAME'], 'password': os.environ['ADMIN_PASSWORD']})
+
+    for name, url in (
+        ('dashboard', '/'),
+        ('listings', '/listings'),
+        ('listings_filtered', '/listings?neighborhood=Park+Slope&min_price=3000'),
+        ('search_form', '/search'),
+    ):
+        status = client.get(url).status_code
+        if status != 200:
+            raise RuntimeError(f'{url} returned {status}')
+        results[f'app.{label}.{name}'] = measure(lambda: client.get(url), repeat)
+
+
+def compare(results, baseline, threshold):
+    """Print each benchmark's change against a baseline run and return the names that regressed."""
+    regressions = []
+    print(f'\n{"benchmark":<42} {"baseline":>10} {"current":>10} {"change":>8}')
+    for name, current in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            print(f'{name:<42} {"-":>10} {current["median_ms"]:>9.3f}ms {"new":>8}')
+            continue
+        ratio = current['median_ms'] / before['median_ms'] if before['median_ms'] else 1.0
+        flag = ' !' if ratio > threshold else ''
+        print(f'{name:<42} {before["median_ms"]:>9.3f}ms {current["median_ms"]:>9.3f}ms {ratio:>7.2f}x{flag}')
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='1000,100000', help='comma-separated database sizes (default: 1000,100000)')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per benchmark (default: 20)')
+    parser.add_argument('--only', default=','.join(GROUPS), help=f'comma-separated groups to run (default: all of {",".join(GROUPS)})')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio reported as a regression (default: 1.25)')
+    args = parser.parse_args()
+
+    rows = [int(value) for value in args.rows.split(',') if value]
+    groups = set(args.only.split(','))
+    unknown = groups - set(GROUPS)
+    if unknown:
+        parser.error(f'unknown group(s): {", ".join(sorted(unknown))}')
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        if 'parser' in groups:
+            bench_parser(results, args.repeat)
+        if 'filter' in groups:
+            bench_filter(results, args.repeat)
+        if 'email' in groups:
+            bench_email(results, args.repeat)
+        if groups & {'database', 'app'}:
+            for count in rows:
+                with tempfile.TemporaryDirectory() as tmp:
+                    start = time.perf_counter()
+                    db = build_database(os.path.join(tmp, 'bench.sqlite3'), count)
+                    elapsed = time.perf_counter() - start
+                    if 'database' in groups:
+                        # Built once per size - a single sample
+                        results[f'database.{size_label(count)}.build'] = {
+                            'median_ms': elapsed * 1000, 'min_ms': elapsed * 1000,
+                            'per_unit_us': elapsed / count * 1e6, 'units': count, 'repeat': 1,
+                        }
+                    if 'database' in groups:
+                        bench_database(results, args.repeat, count, db)
+                    if 'app' in groups:
+                        bench_app(results, args.repeat, count, db)
+                    db.close()
+
+    for name, result in results.items():
+        print(f'{name:<42} {result["median_ms"]:>10.3f} ms  {result["per_unit_us"]:>10.2f} us/unit  (x{result["units"]})')
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'html_backend': Parser.backend,
+            'timestamp': datetime.now(UTC).isoformat(timespec='seconds'),
+            'rows': rows,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} benchmark(s) slower than {args.threshold:.2f}x the baseline')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
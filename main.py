@@ -1,42 +1,133 @@
+import argparse
+import os
 import random
 import time
 
-from src.streeteasymonitor.monitor import Monitor
 from src.streeteasymonitor.config import Config
-from src.streeteasymonitor.email_notifier import EmailNotifier
+from src.streeteasymonitor.scheduler import Scheduler, single_flight
 from src.streeteasymonitor.utils import get_datetime
 
+LOCK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'monitor.lock')
+OUTBOX_LOCK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'outbox.lock')
 
-def main(**kwargs):
+
+def random_delay():
     # Add random delay (0-30 seconds) to avoid predictable timing patterns
     # This helps prevent detection when running on schedules
     delay = random.uniform(0, 30)
     print(f'{get_datetime()} Starting in {delay:.1f} seconds to randomize timing...')
     time.sleep(delay)
 
-    try:
-        with Monitor(**kwargs) as monitor:
-            listings = monitor.run()
-            
-            if listings:
-                print(f'{get_datetime()} Found {len(listings)} listings')
-                # Insert all listings into database FIRST to prevent duplicates on retry
-                for listing in listings:
-                    monitor.db.insert_new_listing(listing)
-                
-                # Send batch email notification with all listings
-                email_notifier = EmailNotifier(monitor.config.get_email_config())
-                if email_notifier.send_batch_notification(listings):
-                    print(f'{get_datetime()} Email sent and listings saved to database\n')
-                else:
-                    print(f'{get_datetime()} Email failed but listings were saved to prevent duplicate emails\n')
-    except Exception as e:
-        print(f'Fatal error in main: {e}')
-        import traceback
-        traceback.print_exc()
-        raise
+
+def main(delay=True, **kwargs):
+    """Run one search and notify about its new listings.
+
+    Args:
+        delay (bool): Wait a random 0-30 seconds first, to keep scheduled runs unpredictable.
+        **kwargs: Search parameters.
+
+    Returns:
+        Optional[list]: The new listings, or None if another run was in progress.
+    """
+    if delay:
+        random_delay()
+
+    with single_flight(LOCK_PATH) as acquired:
+        if not acquired:
+            print(f'{get_datetime()} Another run is in progress - exiting')
+            return None
+
+        # The scraper stack (requests, bs4, fake-useragent) is only imported once a run starts
+        from src.streeteasymonitor.monitor import Monitor
+
+        try:
+            with Monitor(**kwargs) as monitor:
+                listings = monitor.run()
+                monitor.notify(listings)
+        except Exception as e:
+            print(f'Fatal error in main: {e}')
+            import traceback
+            traceback.print_exc()
+            raise
+
+    # The run is complete once its listings are committed - email them (and anything still owed) afterwards
+    send_notifications()
+    return listings
+
+
+def send_notifications(config=None):
+    """Send every notification waiting in the outbox, including ones that failed on earlier runs.
+
+    Returns the number of listings notified.
+    """
+    with single_flight(OUTBOX_LOCK_PATH) as acquired:
+        if not acquired:
+            print(f'{get_datetime()} Another process is sending notifications - exiting')
+            return 0
+
+        from urllib.parse import urlsplit
+
+        from src.streeteasymonitor.database import Database
+        from src.streeteasymonitor.outbox import OutboxSender
+        from src.streeteasymonitor.ratelimit import AdaptiveRateLimiter
+        from src.streeteasymonitor.search import Search
+        from src.streeteasymonitor.utils import get_base_url
+
+        db = Database()
+        # Listing page fetches for the email share the scrape's rate limit and cooldown
+        limiter = AdaptiveRateLimiter(Search.request_delay, key=urlsplit(get_base_url()).netloc)
+        try:
+            return OutboxSender(db, config, limiter).drain()
+        finally:
+            limiter.close()
+            db.close()
+
+
+def run_profiles(profiles, max_workers=4, config=None):
+    """Run several searches concurrently on one database, HTTP connection pool and request rate limit.
+
+    Each profile still gets its own results and its own notification email.
+
+    Returns a list with each profile's new listings, or None where that profile failed.
+    """
+    random_delay()
+
+    with single_flight(LOCK_PATH) as acquired:
+        if not acquired:
+            print(f'{get_datetime()} Another run is in progress - exiting')
+            return []
+
+        from src.streeteasymonitor.runner import ProfileRunner
+
+        with ProfileRunner(profiles, max_workers=max_workers, config=config, outbox_lock_path=OUTBOX_LOCK_PATH) as runner:
+            return runner.run()
+
+
+def daemon(profiles, interval=8 * 60, jitter=60, max_workers=4, config=None):
+    """Keep the session, database and caches warm and run the searches on an in-process jittered schedule."""
+    from src.streeteasymonitor.runner import ProfileRunner
+
+    print(f'{get_datetime()} Running {len(profiles)} profile(s) every {interval / 60:.0f}±{jitter / 60:.1f} minutes')
+    with ProfileRunner(profiles, max_workers=max_workers, config=config, outbox_lock_path=OUTBOX_LOCK_PATH) as runner:
+        Scheduler(runner.run, interval, jitter, LOCK_PATH).run_forever()
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check StreetEasy for new rental listings.')
+    parser.add_argument('--daemon', action='store_true', help='keep running and search on a schedule instead of once')
+    parser.add_argument('--interval', type=float, default=8, help='minutes between daemon runs (default: 8)')
+    parser.add_argument('--jitter', type=float, default=1, help='maximum minutes of random jitter per daemon run (default: 1)')
+    parser.add_argument('--send', action='store_true', help='only send the notifications waiting in the outbox')
+    args = parser.parse_args()
+
     cfg = Config()
-    main(**cfg.get_search_params())
+    profiles = cfg.get_profiles()
+    workers = int(cfg.env('PROFILE_WORKERS', default='4'))
+    if args.send:
+        send_notifications(config=cfg)
+    elif args.daemon:
+        daemon(profiles or [cfg.get_search_params()], args.interval * 60, args.jitter * 60, max_workers=workers, config=cfg)
+    elif profiles:
+        run_profiles(profiles, max_workers=workers, config=cfg)
+    else:
+        main(**cfg.get_search_params())
@@ -0,0 +1,124 @@
+from functools import lru_cache
+import hashlib
+import json
+import os
+
+dir = os.path.dirname(os.path.abspath(__file__))
+
+AREAS_PATH = os.path.join(dir, 'data/areas.json')
+INDEX_PATH = os.path.join(dir, 'data/areas.index.json')
+
+
+def build_area_index(path: str = AREAS_PATH) -> dict:
+    """Build the compact area index from StreetEasy's full area data, leaving out the boundary polylines.
+
+    Returns:
+        dict: `names` (name -> id), `parents` (id -> parent id or None), `levels` (id -> depth) and the
+            `source_hash` and `source_size` of the area data the index was built from.
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    areas = json.loads(content)
+
+    return {
+        'source_hash': hashlib.sha1(content).hexdigest(),
+        'source_size': len(content),
+        'names': {area['name']: area['id'] for area in areas},
+        'parents': {area['id']: None if area['parent_id'] is None else str(area['parent_id']) for area in areas},
+        'levels': {area['id']: area['level'] for area in areas},
+    }
+
+
+def write_area_index(index: dict, path: str = INDEX_PATH) -> None:
+    """Write an area index as compact JSON with sorted keys, so rebuilding from the same area data is byte-identical."""
+    with open(path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'), sort_keys=True)
+
+
+@lru_cache(maxsize=None)
+def get_area_index() -> dict:
+    """Load the precompiled area index, rebuilding it if it is missing or out of date with areas.json.
+
+    areas.json is only hashed when it is newer than the index or its size changed, e.g. after a fresh checkout.
+    """
+    try:
+        with open(INDEX_PATH, 'r') as f:
+            index = json.load(f)
+        source = os.stat(AREAS_PATH)
+        if index.get('source_size') == source.st_size and os.stat(INDEX_PATH).st_mtime_ns >= source.st_mtime_ns:
+            return index
+        with open(AREAS_PATH, 'rb') as f:
+            source_hash = hashlib.sha1(f.read()).hexdigest()
+        if index.get('source_hash') == source_hash:
+            try:
+                os.utime(INDEX_PATH)  # Still current - skip hashing on the next start
+            except OSError:
+                pass
+            return index
+    except (OSError, ValueError):
+        pass
+
+    index = build_area_index(AREAS_PATH)
+    try:
+        write_area_index(index, INDEX_PATH)
+    except OSError:
+        pass  # Read-only install - keep the in-memory index
+    return index
+
+
+def get_area_map() -> dict[str, str]:
+    """Return StreetEasy's area name to ID mapping."""
+    return get_area_index()['names']
+
+
+@lru_cache(maxsize=None)
+def get_area_descendants() -> dict[str, frozenset[str]]:
+    """Return each area ID's descendant closure - the area itself and every area nested below it at any depth."""
+    parents = get_area_index()['parents']
+    descendants = {area_id: {area_id} for area_id in parents}
+
+    # Walking up from every area touches each ancestor once per descendant - a few thousand steps in all
+    for area_id in parents:
+        parent = parents[area_id]
+        while parent in descendants:
+            descendants[parent].add(area_id)
+            parent = parents[parent]
+
+    return {area_id: frozenset(ids) for area_id, ids in descendants.items()}
+
+
+BOROUGHS = ('Manhattan', 'Bronx', 'Brooklyn', 'Queens', 'Staten Island')
+
+
+@lru_cache(maxsize=None)
+def get_area_boroughs() -> dict[str, str]:
+    """Return the borough each area lies in, keyed by area name. Areas spanning several boroughs are left out."""
+    area_map = get_area_map()
+    descendants = get_area_descendants()
+    names = {area_id: name for name, area_id in area_map.items()}
+    return {
+        names[area_id]: borough
+        for borough in BOROUGHS if borough in area_map
+        for area_id in descendants[area_map[borough]] if area_id in names
+    }
+
+
+@lru_cache(maxsize=64)
+def expand_areas(names: tuple[str, ...]) -> frozenset[str]:
+    """Return the IDs of the named areas together with every area nested within them.
+
+    Unknown names are ignored, so the result may be empty.
+    """
+    area_map = get_area_map()
+    descendants = get_area_descendants()
+    ids = set()
+    for name in names:
+        area_id = area_map.get(name)
+        if area_id is not None:
+            ids |= descendants[area_id]
+    return frozenset(ids)
+
+
+if __name__ == '__main__':
+    write_area_index(build_area_index())
+    print(f'Wrote {INDEX_PATH}')
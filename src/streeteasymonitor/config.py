@@ -1,5 +1,4 @@
 from environs import Env
-from fake_useragent import UserAgent
 
 
 class Config:
@@ -42,6 +41,7 @@ class Config:
             # 'gym',
         ],
         'no_fee': False,
+        'max_pages': 1,  # Results pages to crawl per run (stops early at already-stored listings)
     }
 
     filters = {
@@ -59,16 +59,21 @@ class Config:
             # 'New Development',
         ],
     }
+    filter_ignore_case = False  # Match the address/neighborhood/listed_by rules above regardless of case
 
     def __init__(self):
         self.env = Env()
         self.env.read_env()
-        self._ua = UserAgent()  # Cache UserAgent instance for performance
+        self._ua = None  # UserAgent instance, loaded on first use and then cached for performance
 
     def get_headers(self):
         # Rotate user agents to avoid detection
         # Use fake-useragent library to get realistic, rotating user agents
         try:
+            if self._ua is None:
+                from fake_useragent import UserAgent
+
+                self._ua = UserAgent()
             user_agent = self._ua.random
         except Exception:
             # Fallback to a recent Chrome user agent if fake-useragent fails
@@ -131,4 +136,28 @@ class Config:
             'areas': self._parse_list(self.env('AREAS', default=','.join(self.defaults['areas']))),
             'amenities': self._parse_list(self.env('AMENITIES', default=','.join(self.defaults['amenities']))),
             'no_fee': self.env('NO_FEE', default=str(self.defaults.get('no_fee', False))).lower() in ('1', 'true', 'yes'),
+            'max_pages': _int_env('MAX_PAGES', self.defaults['max_pages']),
         }
+
+    def get_profiles(self):
+        """Load a list of search profiles for running several searches in one process.
+
+        `PROFILES` may hold a JSON list inline or the path to a JSON file containing one. Each profile
+        uses the keys of `get_search_params`, and any key it omits falls back to that profile's value.
+
+        Returns an empty list when no profiles are configured.
+        """
+        value = self.env('PROFILES', default='').strip()
+        if not value:
+            return []
+
+        import json
+
+        if value.startswith('['):
+            profiles = json.loads(value)
+        else:
+            with open(value, 'r') as f:
+                profiles = json.load(f)
+
+        base = self.get_search_params()
+        return [{**base, **profile} for profile in profiles]
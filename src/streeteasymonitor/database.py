@@ -1,20 +1,98 @@
+from contextlib import contextmanager
+import json
 import os
 import sqlite3
+import threading
+import time
 
 
 class Database:
-    def __init__(self):
+    """SQLite persistence for listings.
+
+    Each thread reuses one long-lived connection. The database runs in WAL mode so that dashboard
+    reads never block (or are blocked by) a scrape that is inserting listings.
+
+    Attributes:
+        columns (tuple[str]): Whitelist of insertable listing columns, preventing SQL injection.
+        max_variables (int): Maximum number of host parameters bound in one statement.
+        busy_timeout (float): Seconds to wait for a competing writer before failing with "database is locked".
+        cache_size_kib (int): Page cache size per connection.
+        outbox_lease (float): Seconds a claimed outbox entry stays hidden from other senders while it is being sent.
+        outbox_backoff (float): Delay before the first retry of a failed notification, doubled per further failure.
+        outbox_max_backoff (float): Longest delay between retries; failed notifications are retried indefinitely.
+        rejected_ttl (float): Seconds a listing rejected by the search filters is remembered before it is parsed again.
+        job_ttl (float): Seconds a finished web search job is kept for status polls.
+        job_timeout (float): Seconds after which an unfinished web search job is considered abandoned, e.g. because
+            the web worker running it exited.
+    """
+
+    columns = ('listing_id', 'url', 'price', 'address', 'neighborhood', 'listed_by')
+    max_variables = 500
+    busy_timeout = 10.0
+    cache_size_kib = 16384
+    outbox_lease = 10 * 60.0
+    outbox_backoff = 60.0
+    outbox_max_backoff = 6 * 60 * 60.0
+    rejected_ttl = 30 * 24 * 60 * 60.0
+    job_ttl = 60 * 60.0
+    job_timeout = 30 * 60.0
+
+    def __init__(self, db_path=None):
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.data_dir = os.path.join(self.base_dir, '../..', 'data')
-        self.db_path = os.path.join(self.data_dir, 'db.sqlite3')
+        self.db_path = db_path or os.path.join(self.data_dir, 'db.sqlite3')
+        self._local = threading.local()
 
-        os.makedirs(self.data_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         self.create_table()
 
+    @property
+    def conn(self):
+        """The calling thread's connection, opened and tuned on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None leaves transactions to `transaction()` instead of implicit BEGINs
+            conn = sqlite3.connect(self.db_path, timeout=Database.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA cache_size=-{Database.cache_size_kib}')
+            conn.execute(f'PRAGMA busy_timeout={int(Database.busy_timeout * 1000)}')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements in one write transaction, committing on success and rolling back on error.
+
+        The write lock is taken up front (BEGIN IMMEDIATE). Nested uses join the outer transaction.
+
+        Yields:
+            sqlite3.Connection: The calling thread's connection.
+        """
+        conn = self.conn
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def close(self):
+        """Close the calling thread's connection, if it has one."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
     def create_table(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with self.transaction() as conn:
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS listings (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -26,13 +104,192 @@ class Database:
                     listed_by TEXT
                 )
             """)
-            conn.commit()
+            # Support the web UI's filters and newest-first ordering without full table scans
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_listings_created_at ON listings (created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_listings_neighborhood ON listings (neighborhood, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_listings_price ON listings (price)')
+        self.create_statistics()
+
+        with self.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS listing_details (
+                    listing_id TEXT PRIMARY KEY,
+                    photo_url TEXT,
+                    full_address TEXT,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_state (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fingerprint TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS map_markers (
+                    key TEXT PRIMARY KEY,
+                    full_address TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Notifications owed for newly stored listings, written in the same transaction as the listings
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    listing_id TEXT NOT NULL,
+                    profile TEXT NOT NULL DEFAULT '',
+                    created_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    sent_at REAL
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (next_attempt_at) WHERE sent_at IS NULL')
+            # Listings the search filters turned down, per search scope, so later runs treat them as known
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rejected_ids (
+                    scope TEXT NOT NULL,
+                    listing_id TEXT NOT NULL,
+                    rejected_at REAL NOT NULL,
+                    PRIMARY KEY (scope, listing_id)
+                ) WITHOUT ROWID
+            """)
+            # Searches started from the web app, shared by every web worker process
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    submitted_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    listings TEXT,
+                    error TEXT
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_active ON jobs (key, submitted_at) WHERE finished_at IS NULL')
+
+    def create_statistics(self):
+        """Create aggregate tables kept up to date by triggers on every insert or delete.
 
-    def get_existing_ids(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT listing_id FROM listings')
-            return set(row[0] for row in cursor.fetchall())
+        The aggregates are backfilled from existing rows the first time they are created.
+        """
+        with self.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS listing_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total INTEGER NOT NULL DEFAULT 0,
+                    price_count INTEGER NOT NULL DEFAULT 0,
+                    price_sum REAL NOT NULL DEFAULT 0
+                )
+            """)
+            for table, key in (('neighborhood_stats', 'neighborhood'), ('daily_stats', 'day')):
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        {key} TEXT PRIMARY KEY,
+                        total INTEGER NOT NULL DEFAULT 0,
+                        price_count INTEGER NOT NULL DEFAULT 0,
+                        price_sum REAL NOT NULL DEFAULT 0
+                    )
+                """)
+
+            for event, row, sign in (('INSERT', 'NEW', '+'), ('DELETE', 'OLD', '-')):
+                delta = f"""
+                    total = total {sign} 1,
+                    price_count = price_count {sign} ({row}.price IS NOT NULL),
+                    price_sum = price_sum {sign} COALESCE({row}.price, 0)
+                """
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS listings_stats_{event.lower()} AFTER {event} ON listings
+                    BEGIN
+                        UPDATE listing_stats SET {delta} WHERE id = 1;
+                        INSERT OR IGNORE INTO neighborhood_stats (neighborhood)
+                            SELECT {row}.neighborhood WHERE {row}.neighborhood IS NOT NULL;
+                        UPDATE neighborhood_stats SET {delta} WHERE neighborhood = {row}.neighborhood;
+                        INSERT OR IGNORE INTO daily_stats (day) VALUES (date({row}.created_at));
+                        UPDATE daily_stats SET {delta} WHERE day = date({row}.created_at);
+                    END
+                """)
+
+            if conn.execute('SELECT 1 FROM listing_stats WHERE id = 1').fetchone() is None:
+                self.rebuild_statistics()
+
+    def rebuild_statistics(self):
+        """Recompute the aggregate tables from scratch with one pass over the listings table."""
+        aggregates = 'COUNT(*), COUNT(price), COALESCE(SUM(price), 0)'
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM listing_stats')
+            conn.execute('DELETE FROM neighborhood_stats')
+            conn.execute('DELETE FROM daily_stats')
+            conn.execute(f'INSERT INTO listing_stats (id, total, price_count, price_sum) SELECT 1, {aggregates} FROM listings')
+            conn.execute(f"""
+                INSERT INTO neighborhood_stats (neighborhood, total, price_count, price_sum)
+                SELECT neighborhood, {aggregates} FROM listings WHERE neighborhood IS NOT NULL GROUP BY neighborhood
+            """)
+            conn.execute(f"""
+                INSERT INTO daily_stats (day, total, price_count, price_sum)
+                SELECT date(created_at), {aggregates} FROM listings GROUP BY date(created_at)
+            """)
+
+    def get_known_ids(self, candidate_ids):
+        """Return which of the given listing IDs are already stored.
+
+        Membership is answered against the UNIQUE index on `listing_id`, so the cost depends on the number
+        of candidates rather than the size of the table.
+
+        Args:
+            candidate_ids (Iterable[str]): Listing IDs to look up, e.g. every listing on a results page.
+
+        Returns:
+            set[str]: The subset of `candidate_ids` present in the database.
+        """
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        known = set()
+        # Stay under SQLite's host parameter limit (999 on older builds)
+        for i in range(0, len(candidate_ids), Database.max_variables):
+            chunk = candidate_ids[i:i + Database.max_variables]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = self.conn.execute(f'SELECT listing_id FROM listings WHERE listing_id IN ({placeholders})', chunk)
+            known.update(row[0] for row in cursor.fetchall())
+        return known
+
+    def get_rejected_ids(self, scope, candidate_ids):
+        """Return which of the given listing IDs the search filters of `scope` rejected within `rejected_ttl`.
+
+        Args:
+            scope (str): Key of the search areas and filter rules the listings were rejected under.
+            candidate_ids (Iterable[str]): Listing IDs to look up, e.g. every listing on a results page.
+
+        Returns:
+            set[str]: The subset of `candidate_ids` rejected under `scope`.
+        """
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        cutoff = time.time() - Database.rejected_ttl
+        rejected = set()
+        for i in range(0, len(candidate_ids), Database.max_variables):
+            chunk = candidate_ids[i:i + Database.max_variables]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = self.conn.execute(
+                f'SELECT listing_id FROM rejected_ids WHERE scope = ? AND rejected_at >= ? AND listing_id IN ({placeholders})',
+                [scope, cutoff, *chunk],
+            )
+            rejected.update(row[0] for row in cursor.fetchall())
+        return rejected
+
+    def save_rejected_ids(self, scope, listing_ids):
+        """Remember listings rejected by the search filters of `scope`, and forget rejections older than `rejected_ttl`."""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO rejected_ids (scope, listing_id, rejected_at) VALUES (?, ?, ?)',
+                [(scope, listing_id, now) for listing_id in listing_ids],
+            )
+            conn.execute('DELETE FROM rejected_ids WHERE rejected_at < ?', (now - Database.rejected_ttl,))
 
     def get_listings_sorted(self, limit=None):
         """Get all listings sorted by created_at descending.
@@ -43,67 +300,380 @@ class Database:
         Returns:
             list[dict]: List of listing dictionaries.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            if limit:
-                cursor.execute('SELECT * FROM listings ORDER BY created_at DESC LIMIT ?', (limit,))
-            else:
-                cursor.execute('SELECT * FROM listings ORDER BY created_at DESC')
-            return [dict(row) for row in cursor.fetchall()]
+        return self.get_listings(limit=limit)
+
+    @staticmethod
+    def _where(neighborhood=None, min_price=None, max_price=None, since=None, until=None):
+        """Build a WHERE clause and its parameters from optional listing predicates."""
+        clauses, params = [], []
+        if neighborhood:
+            clauses.append('neighborhood = ?')
+            params.append(neighborhood)
+        if min_price is not None:
+            clauses.append('price >= ?')
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append('price <= ?')
+            params.append(max_price)
+        if since:
+            clauses.append('created_at >= ?')
+            params.append(str(since))
+        if until:
+            clauses.append('created_at < ?')
+            params.append(str(until))
+        where = f'WHERE {" AND ".join(clauses)}' if clauses else ''
+        return where, params
+
+    def get_listings(self, neighborhood=None, min_price=None, max_price=None, since=None, until=None, limit=None, offset=0):
+        """Get listings matching the given predicates, newest first.
 
-    def get_statistics(self):
-        """Get database statistics.
+        Filtering, ordering and limiting all happen in SQL on indexed columns.
+
+        Args:
+            neighborhood (str, optional): Exact neighborhood name.
+            min_price (float, optional): Inclusive lower price bound.
+            max_price (float, optional): Inclusive upper price bound.
+            since (str, optional): Inclusive lower bound on created_at (UTC), e.g. '2026-01-31'.
+            until (str, optional): Exclusive upper bound on created_at (UTC).
+            limit (int, optional): Maximum number of results to return. Defaults to None (all results).
+            offset (int, optional): Number of matching results to skip.
 
         Returns:
-            dict: Statistics including total count, average price, etc.
+            list[dict]: List of listing dictionaries.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        where, params = Database._where(neighborhood, min_price, max_price, since, until)
+        sql = f'SELECT * FROM listings {where} ORDER BY created_at DESC'
+        if limit:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        cursor = self.conn.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
 
-            # Total count
-            cursor.execute('SELECT COUNT(*) FROM listings')
-            total = cursor.fetchone()[0]
+    def count_listings(self, neighborhood=None, min_price=None, max_price=None, since=None, until=None):
+        """Count listings matching the same predicates as `get_listings`."""
+        where, params = Database._where(neighborhood, min_price, max_price, since, until)
+        return self.conn.execute(f'SELECT COUNT(*) FROM listings {where}', params).fetchone()[0]
 
-            # Average price
-            cursor.execute('SELECT AVG(price) FROM listings')
-            avg_price = cursor.fetchone()[0] or 0
+    def data_version(self):
+        """Return a counter that changes whenever another connection commits to the database.
 
-            # Unique neighborhoods count
-            cursor.execute('SELECT COUNT(DISTINCT neighborhood) FROM listings WHERE neighborhood IS NOT NULL')
-            neighborhoods = cursor.fetchone()[0]
+        Costs no table access, so it can be polled to detect changes before querying for them.
+        """
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
 
-            return {
-                'total_listings': total,
-                'avg_price': avg_price,
-                'neighborhoods_count': neighborhoods
-            }
+    def get_last_id(self):
+        """Return the row id of the newest listing, or 0 if there are none."""
+        return self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM listings').fetchone()[0]
 
-    def insert_new_listing(self, listing):
-        # Whitelist allowed columns to prevent SQL injection
-        ALLOWED_COLUMNS = {'listing_id', 'url', 'price', 'address', 'neighborhood', 'listed_by'}
+    def get_listings_after(self, last_id, limit=None):
+        """Get the listings inserted after row id `last_id`, oldest first.
+
+        Args:
+            last_id (int): Row id of the newest listing already seen.
+            limit (int, optional): Maximum number of results to return. Defaults to None (all results).
+
+        Returns:
+            list[dict]: List of listing dictionaries.
+        """
+        sql = 'SELECT * FROM listings WHERE id > ? ORDER BY id'
+        params = [last_id]
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        cursor = self.conn.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_neighborhoods(self):
+        """Get the sorted distinct neighborhoods of all stored listings.
+
+        Read from the trigger-maintained neighborhood aggregates rather than the listings table.
+
+        Returns:
+            list[str]: Neighborhood names.
+        """
+        cursor = self.conn.execute(
+            "SELECT neighborhood FROM neighborhood_stats WHERE total > 0 AND neighborhood != '' ORDER BY neighborhood"
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_statistics(self, days=30):
+        """Get database statistics from the incrementally maintained aggregate tables.
+
+        Args:
+            days (int, optional): Number of most recent days to include in the per-day breakdown.
+
+        Returns:
+            dict: Statistics including total count, average price, neighborhood count, and per-neighborhood
+                and per-day breakdowns (each with a count and average price).
+        """
+        cursor = self.conn.cursor()
+
+        cursor.execute('SELECT total, price_count, price_sum FROM listing_stats WHERE id = 1')
+        total, price_count, price_sum = cursor.fetchone() or (0, 0, 0)
 
-        # Remove is_featured field and any other non-whitelisted fields
-        listing_to_insert = {
-            k: v for k, v in listing.items()
-            if k in ALLOWED_COLUMNS
+        def breakdown(row):
+            return {'count': row['total'], 'avg_price': row['price_sum'] / row['price_count'] if row['price_count'] else 0}
+
+        cursor.execute('SELECT * FROM neighborhood_stats WHERE total > 0 ORDER BY total DESC, neighborhood')
+        by_neighborhood = {row['neighborhood']: breakdown(row) for row in cursor.fetchall()}
+
+        cursor.execute('SELECT * FROM daily_stats WHERE total > 0 ORDER BY day DESC LIMIT ?', (days,))
+        by_day = {row['day']: breakdown(row) for row in cursor.fetchall()}
+
+        return {
+            'total_listings': total,
+            'avg_price': price_sum / price_count if price_count else 0,
+            'neighborhoods_count': len(by_neighborhood),
+            'by_neighborhood': by_neighborhood,
+            'by_day': by_day,
         }
 
-        if not listing_to_insert:
+    def get_listing_details(self, listing_ids, max_age):
+        """Get cached listing page details that were fetched within the last `max_age` seconds.
+
+        Returns:
+            dict[str, dict]: The photo_url and full_address keyed by listing_id, for cache hits only.
+        """
+        listing_ids = list(dict.fromkeys(listing_ids))
+        cutoff = time.time() - max_age
+        details = {}
+        for i in range(0, len(listing_ids), Database.max_variables):
+            chunk = listing_ids[i:i + Database.max_variables]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = self.conn.execute(
+                f'SELECT listing_id, photo_url, full_address FROM listing_details WHERE listing_id IN ({placeholders}) AND fetched_at >= ?',
+                chunk + [cutoff],
+            )
+            details.update((row['listing_id'], {'photo_url': row['photo_url'], 'full_address': row['full_address']}) for row in cursor)
+        return details
+
+    def save_listing_details(self, details):
+        """Cache listing page details.
+
+        Args:
+            details (dict[str, dict]): The photo_url and full_address keyed by listing_id.
+        """
+        now = time.time()
+        rows = [(listing_id, d.get('photo_url'), d.get('full_address'), now) for listing_id, d in details.items()]
+        with self.transaction() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO listing_details (listing_id, photo_url, full_address, fetched_at) VALUES (?, ?, ?, ?)',
+                rows,
+            )
+
+    def get_search_state(self, url):
+        """Get the HTTP validators and listing fingerprint saved for a search results URL.
+
+        Returns:
+            dict: The etag, last_modified and fingerprint, or None if the URL has not been fetched before.
+        """
+        row = self.conn.execute('SELECT etag, last_modified, fingerprint FROM search_state WHERE url = ?', (url,)).fetchone()
+        return dict(row) if row else None
+
+    def save_search_state(self, url, etag=None, last_modified=None, fingerprint=None):
+        """Save the HTTP validators and listing fingerprint of a search results URL."""
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO search_state (url, etag, last_modified, fingerprint, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (url, etag, last_modified, fingerprint, time.time()),
+            )
+
+    def get_map_markers(self, keys):
+        """Get cached full addresses for map marker keys (building slugs and normalized addresses).
+
+        Returns:
+            dict[str, str]: Full addresses keyed by marker key, for cache hits only.
+        """
+        keys = list(dict.fromkeys(keys))
+        markers = {}
+        for i in range(0, len(keys), Database.max_variables):
+            chunk = keys[i:i + Database.max_variables]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = self.conn.execute(f'SELECT key, full_address FROM map_markers WHERE key IN ({placeholders})', chunk)
+            markers.update((row['key'], row['full_address']) for row in cursor)
+        return markers
+
+    def save_map_markers(self, markers):
+        """Cache full addresses for map marker keys.
+
+        Args:
+            markers (dict[str, str]): Full addresses keyed by marker key.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO map_markers (key, full_address, updated_at) VALUES (?, ?, ?)',
+                [(key, full_address, now) for key, full_address in markers.items()],
+            )
+
+    def insert_new_listing(self, listing):
+        """Insert one listing, ignoring it if its listing_id is already stored.
+
+        Returns:
+            bool: Whether the listing was newly inserted.
+        """
+        if not any(k in Database.columns for k in listing):
             raise ValueError('No valid columns to insert')
 
+        inserted = listing.get('listing_id') in self.insert_listings([listing])
+        if inserted:
+            from .utils import get_datetime
+            print(f'{get_datetime()} ✓ Saved listing: {listing.get("listing_id")} ({listing.get("address")})')
+        return inserted
+
+    def insert_listings(self, listings, enqueue=False, profile=''):
+        """Insert a batch of listings in a single transaction.
+
+        Listings whose listing_id is already stored are ignored, as are non-whitelisted fields such as is_featured.
+
+        Args:
+            listings (Iterable[dict]): Listings to insert.
+            enqueue (bool): Also queue a notification for each newly inserted listing in the outbox, atomically with
+                the insert - either both are stored or neither is.
+            profile (str): Search profile the queued notifications belong to; each profile gets its own email.
+
+        Returns:
+            set[str]: The listing IDs that were newly inserted (as opposed to ignored duplicates).
+        """
+        rows = [tuple(listing.get(column) for column in Database.columns) for listing in listings]
+        if not rows:
+            return set()
+
         # Build query with whitelisted columns
-        columns = ', '.join(listing_to_insert.keys())
-        placeholders = ', '.join('?' * len(listing_to_insert))
+        columns = ', '.join(Database.columns)
+        placeholders = ', '.join('?' * len(Database.columns))
         sql = f'INSERT OR IGNORE INTO listings ({columns}) VALUES ({placeholders})'
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, tuple(listing_to_insert.values()))
-            conn.commit()
+        # The write lock is held from the start, so the ids assigned by this batch all follow last_id
+        with self.transaction() as conn:
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM listings').fetchone()[0]
+            conn.executemany(sql, rows)
+            if enqueue:
+                conn.execute(
+                    'INSERT INTO outbox (listing_id, profile, created_at) SELECT listing_id, ?, ? FROM listings WHERE id > ?',
+                    (profile, time.time(), last_id),
+                )
+            cursor = conn.execute('SELECT listing_id FROM listings WHERE id > ?', (last_id,))
+            return {row[0] for row in cursor.fetchall()}
+
+    def claim_outbox(self, limit=100):
+        """Claim the notifications that are due, oldest first, hiding them from other senders for `outbox_lease` seconds.
+
+        A sender that dies mid-send loses its lease, so the claimed notifications come due again rather than being lost.
+
+        Returns:
+            list[dict]: The claimed entries - outbox id, profile and attempts, plus the listing's fields.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            rows = conn.execute(
+                """
+                SELECT o.id AS outbox_id, o.profile, o.attempts, l.listing_id, l.url, l.price, l.address,
+                       l.neighborhood, l.listed_by
+                FROM outbox o JOIN listings l ON l.listing_id = o.listing_id
+                WHERE o.sent_at IS NULL AND o.next_attempt_at <= ?
+                ORDER BY o.id
+                LIMIT ?
+                """,
+                (now, limit),
+            ).fetchall()
+            conn.executemany(
+                'UPDATE outbox SET next_attempt_at = ? WHERE id = ?',
+                [(now + Database.outbox_lease, row['outbox_id']) for row in rows],
+            )
+        return [dict(row) for row in rows]
+
+    def complete_outbox(self, outbox_ids):
+        """Mark notifications as sent."""
+        with self.transaction() as conn:
+            conn.executemany(
+                'UPDATE outbox SET sent_at = ?, last_error = NULL WHERE id = ?',
+                [(time.time(), outbox_id) for outbox_id in outbox_ids],
+            )
+
+    def fail_outbox(self, outbox_ids, error):
+        """Record a failed send and schedule the next attempt with exponential backoff."""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                """
+                UPDATE outbox
+                SET attempts = attempts + 1, last_error = ?,
+                    next_attempt_at = ? + MIN(?, ? * (1 << MIN(attempts, 20)))
+                WHERE id = ?
+                """,
+                [
+                    (str(error)[:500], now, Database.outbox_max_backoff, Database.outbox_backoff, outbox_id)
+                    for outbox_id in outbox_ids
+                ],
+            )
+
+    def count_outbox(self):
+        """Return the number of notifications not sent yet."""
+        return self.conn.execute('SELECT COUNT(*) FROM outbox WHERE sent_at IS NULL').fetchone()[0]
+
+    def submit_job(self, job_id, key, params):
+        """Record a queued web search job, unless a job with the same key is still queued or running.
+
+        Finished jobs older than `job_ttl` are deleted on the way.
+
+        Args:
+            job_id (str): ID for the new job.
+            key (str): Deduplication key of the job's parameters.
+            params (dict): Search parameters, stored as JSON.
+
+        Returns:
+            tuple[str, bool]: The ID of the new or the existing job, and whether it was newly created.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM jobs WHERE finished_at < ?', (now - Database.job_ttl,))
+            row = conn.execute(
+                'SELECT id FROM jobs WHERE key = ? AND finished_at IS NULL AND submitted_at >= ? ORDER BY submitted_at LIMIT 1',
+                (key, now - Database.job_timeout),
+            ).fetchone()
+            if row:
+                return row[0], False
+            conn.execute(
+                "INSERT INTO jobs (id, key, status, params, submitted_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, key, json.dumps(params, default=str), now),
+            )
+            return job_id, True
+
+    def start_job(self, job_id):
+        """Mark a web search job as running."""
+        with self.transaction() as conn:
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def finish_job(self, job_id, status, listings=None, error=None):
+        """Record the outcome of a web search job: its status, new listings (stored as JSON) and error message."""
+        with self.transaction() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, listings = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, None if listings is None else json.dumps(listings, default=str), error, time.time(), job_id),
+            )
+
+    def get_job(self, job_id):
+        """Get a web search job with its parameters and listings decoded, and its place in the queue if queued.
+
+        Returns:
+            dict: The job, or None for an unknown or expired ID. An unfinished job older than `job_timeout` is
+                reported as failed.
+        """
+        row = self.conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['listings'] = None if job['listings'] is None else json.loads(job['listings'])
+        job.pop('key')
 
-            # Check if insert was successful (rowcount > 0)
-            if cursor.rowcount > 0:
-                from .utils import get_datetime
-                print(f'{get_datetime()} ✓ Saved listing: {listing.get("listing_id")} ({listing.get("address")})')
-            # If rowcount == 0, it means IGNORE was triggered (duplicate key)
+        now = time.time()
+        if job['finished_at'] is None and job['submitted_at'] < now - Database.job_timeout:
+            job.update(status='failed', error='The search was abandoned')
+        elif job['status'] == 'queued':
+            job['position'] = self.conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND submitted_at <= ? AND submitted_at >= ?",
+                (job['submitted_at'], now - Database.job_timeout),
+            ).fetchone()[0]
+        return job
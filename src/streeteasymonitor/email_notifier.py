@@ -1,28 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor, wait
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from urllib.parse import quote
-from .utils import get_datetime
+from urllib.parse import quote, urlparse
+from .ratelimit import TokenBucket
+from .utils import get_base_url, get_datetime
 
 
 class EmailNotifier:
-    def __init__(self, smtp_config):
+    """Sends listing notifications, enriched with photos and a map fetched from StreetEasy listing pages.
+
+    Attributes:
+        fetch_workers (int): Maximum number of listing pages fetched concurrently.
+        fetch_rate (float): Listing page requests per second allowed per host (one every 2.5 s on average).
+        fetch_budget (float): Total seconds the listing page lookups of one email may take before falling back to placeholders.
+        details_ttl (float): Seconds a listing page's cached details stay fresh.
+        slug_boroughs (dict[str, str]): Borough named by the suffix of a StreetEasy building slug.
+    """
+
+    fetch_workers = 4
+    fetch_rate = 0.4
+    fetch_budget = 60.0
+    details_ttl = 24 * 60 * 60
+    slug_boroughs = {
+        'new_york': 'Manhattan', 'brooklyn': 'Brooklyn', 'queens': 'Queens', 'bronx': 'Bronx',
+        'staten_island': 'Staten Island',
+    }
+
+    def __init__(self, smtp_config, db=None, limiter=None):
+        """Initialize the notifier.
+
+        Args:
+            smtp_config (dict): SMTP and Maps settings from `Config.get_email_config`.
+            db (Database, optional): Database used to cache listing page details across emails.
+            limiter (AdaptiveRateLimiter, optional): The searches' shared limiter, used instead of the per-host
+                bucket for requests to its host so that listing pages and searches share one budget and cooldown.
+        """
         self.smtp_server = smtp_config['server']
         self.smtp_port = smtp_config['port']
         self.sender_email = smtp_config['username']
         self.sender_password = smtp_config['password']
         self.recipient_email = smtp_config['recipient']
         self.maps_api_key = smtp_config.get('maps_api_key', '')
+        self.db = db
+        self.limiter = limiter
+
+        self._session = None
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """A pooled HTTP session shared by every listing page fetch, created on first use."""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from fake_useragent import UserAgent
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=EmailNotifier.fetch_workers)
+                self._session.mount('https://', adapter)
+                self._session.mount('http://', adapter)
+                self._session.headers.update({
+                    'user-agent': UserAgent().random,
+                    'accept-language': 'en-US,en;q=0.9',
+                    'referer': f'{get_base_url()}/',
+                })
+            return self._session
+
+    def _throttle(self, url, timeout=None):
+        """Wait for the per-host rate limit before fetching `url`.
+
+        Returns:
+            bool: Whether the request may proceed before the timeout.
+        """
+        host = urlparse(url).netloc
+        if self.limiter is not None and host == self.limiter.key:
+            return self.limiter.acquire(timeout)
+        with self._lock:
+            bucket = self._buckets.setdefault(host, TokenBucket(EmailNotifier.fetch_rate))
+        return bucket.acquire(timeout)
+
+    def compose(self, listings, profile=''):
+        """Return the subject, HTML body and plain text body of the email for `listings`."""
+        subject = f"StreetSweeper: {len(listings)} New Rental{'s' if len(listings) != 1 else ''} Found"
+        if profile:
+            subject += f' - {profile}'
+        return subject, self._format_html_email(listings), self._format_text_email(listings)
 
     def send_batch_notification(self, listings):
         """Send one email with all listings in HTML format."""
         if not listings:
             return False
-            
-        subject = f"StreetSweeper: {len(listings)} New Rental{'s' if len(listings) != 1 else ''} Found"
-        html_body = self._format_html_email(listings)
-        text_body = self._format_text_email(listings)
-        
+
+        subject, html_body, text_body = self.compose(listings)
+
         try:
             self._send_email(subject, html_body, text_body)
             print(f'{get_datetime()} Batch email sent successfully with {len(listings)} listings\n')
@@ -33,26 +108,20 @@ class EmailNotifier:
 
     def _format_html_email(self, listings):
         """Format all listings as HTML email with photos and cards."""
-        import time
-        import random
-        
+        # One listing page fetch per listing serves both the photos and the map
+        details = self._get_listing_details(listings)
+
         # Build map image URL if API key is available
         map_img_html = ''
         if self.maps_api_key:
-            map_url = self._build_static_map_url(listings)
+            map_url = self._build_static_map_url(listings, details)
             if map_url:
                 map_img_html = f'<img src="{map_url}" alt="Map" style="width: 100%; max-width: 600px; height: auto; margin-bottom: 20px; border-radius: 8px;">'
         
         # Build listing cards
         cards_html = ''
-        for i, listing in enumerate(listings):
-            # Add random delay between photo fetches (except for first one)
-            if i > 0:
-                delay = random.uniform(1.5, 3.5)
-                time.sleep(delay)
-            
-            photo_url = self._get_listing_photo(listing['url'])
-            
+        for listing in listings:
+            photo_url = details.get(listing['listing_id'], {}).get('photo_url') or self._get_placeholder_image()
             cards_html += f'''
             <div style="background: white; border-radius: 12px; overflow: hidden; margin-bottom: 20px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
                 <img src="{photo_url}" alt="{listing['address']}" style="width: 100%; height: 250px; object-fit: cover;">
@@ -108,74 +177,87 @@ class EmailNotifier:
         text += "---\nStreetSweeper - Automated Rental Monitoring"
         return text
     
-    def _get_listing_photo(self, listing_url):
-        """Extract the first photo URL from a StreetEasy listing page."""
+    def _get_listing_details(self, listings):
+        """Get the detail-page fields of every listing, fetching each listing page at most once per cache TTL.
+
+        Cached details are used when a database is available. Cache misses are fetched concurrently within the
+        per-host rate limit and the total time budget, and listings not fetched in time get empty details. Each fetch
+        times out at the end of the budget, and saves its result to the cache itself, so a page that still arrives
+        after the budget ran out is there for the next email.
+
+        Returns:
+            dict[str, dict]: Details (photo_url, full_address) keyed by listing_id.
+        """
+        ids = [listing['listing_id'] for listing in listings]
+        details = self.db.get_listing_details(ids, EmailNotifier.details_ttl) if self.db else {}
+        missing = [listing for listing in listings if listing['listing_id'] not in details]
+        if not missing:
+            return details
+
+        deadline = time.monotonic() + EmailNotifier.fetch_budget
+
+        def fetch(listing):
+            if not self._throttle(listing['url'], timeout=deadline - time.monotonic()):
+                return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            result = self._fetch_listing_details(listing['url'], timeout=min(15, remaining))
+            if result is not None and self.db:
+                try:
+                    self.db.save_listing_details({listing['listing_id']: result})
+                finally:
+                    self.db.close()  # The pool thread's connection
+            return result
+
+        pool = ThreadPoolExecutor(max_workers=EmailNotifier.fetch_workers)
+        futures = [pool.submit(fetch, listing) for listing in missing]
+        done, not_done = wait(futures, timeout=EmailNotifier.fetch_budget)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        if not_done:
+            print(f'  Warning: Listing page budget of {EmailNotifier.fetch_budget:.0f}s ran out, skipping {len(not_done)} listings')
+
+        fetched = {
+            listing['listing_id']: future.result()
+            for listing, future in zip(missing, futures)
+            if future in done and future.result() is not None
+        }
+        return {**details, **fetched}
+
+    def _fetch_listing_details(self, listing_url, timeout=15):
+        """Fetch a StreetEasy listing page and extract its photo and full address in a single parse.
+
+        Returns:
+            dict: The photo_url and full_address (either may be None), or None if the page could not be fetched.
+        """
         try:
-            import requests
-            from fake_useragent import UserAgent
             from bs4 import BeautifulSoup
-            
-            ua = UserAgent()
-            headers = {
-                'user-agent': ua.random,
-                'accept-language': 'en-US,en;q=0.9',
-                'referer': 'https://streeteasy.com/',
-            }
+            import re
             
             # Fetch the listing page
-            response = requests.get(listing_url, headers=headers, timeout=15)
+            response = self.session.get(listing_url, timeout=timeout)
+            if self.limiter is not None and urlparse(listing_url).netloc == self.limiter.key:
+                self.limiter.record(response.status_code, response.headers.get('Retry-After'))
             if response.status_code != 200:
-                print(f"  Warning: Photo fetch returned status {response.status_code} for {listing_url}")
-                return self._get_placeholder_image()
+                print(f"  Warning: Listing page fetch returned status {response.status_code} for {listing_url}")
+                return None
             
             soup = BeautifulSoup(response.content, 'html.parser')
+            details = {'photo_url': None, 'full_address': None}
             
             # Try multiple selectors for images
             # Look for meta og:image tag (most reliable)
             og_image = soup.find('meta', property='og:image')
             if og_image:
-                return og_image.get('content', self._get_placeholder_image())
-            
-            # Look for photo gallery images
-            img = soup.find('img', class_=lambda x: x and 'photo' in str(x).lower())
-            if img and img.get('src'):
-                return img['src']
-            
-            # Look for any Zillow static image
-            img = soup.find('img', src=lambda x: x and 'photos.zillowstatic.com' in x)
-            if img:
-                return img['src']
-            
-            return self._get_placeholder_image()
-            
-        except Exception as e:
-            print(f"  Warning: Could not fetch photo for listing: {e}")
-            return self._get_placeholder_image()
-    
-    def _get_placeholder_image(self):
-        """Return a placeholder image URL."""
-        return 'https://via.placeholder.com/600x400/3498db/ffffff?text=No+Image+Available'
-    
-    def _get_full_address_with_zip(self, listing_url):
-        """Extract full address including ZIP code from listing page."""
-        try:
-            import requests
-            from fake_useragent import UserAgent
-            from bs4 import BeautifulSoup
-            import re
-            
-            ua = UserAgent()
-            headers = {
-                'user-agent': ua.random,
-                'accept-language': 'en-US,en;q=0.9',
-                'referer': 'https://streeteasy.com/',
-            }
-            
-            response = requests.get(listing_url, headers=headers, timeout=10)
-            if response.status_code != 200:
-                return None
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+                details['photo_url'] = og_image.get('content')
+            else:
+                # Look for photo gallery images, then any Zillow static image
+                img = soup.find('img', class_=lambda x: x and 'photo' in str(x).lower())
+                if not (img and img.get('src')):
+                    img = soup.find('img', src=lambda x: x and 'photos.zillowstatic.com' in x)
+                if img and img.get('src'):
+                    details['photo_url'] = img['src']
             
             # Look for address with ZIP in the page text
             # StreetEasy typically shows full address like "123 Main St, Brooklyn, NY 11201"
@@ -184,37 +266,108 @@ class EmailNotifier:
             # Match pattern: Address, Borough, NY ZIP
             zip_pattern = r'([^\n]+),\s*(Brooklyn|Manhattan|Queens|Bronx|Staten Island),\s*NY\s*(\d{5})'
             match = re.search(zip_pattern, page_text)
-            
             if match:
-                return f"{match.group(1).strip()}, {match.group(2)}, NY {match.group(3)}"
+                details['full_address'] = f"{match.group(1).strip()}, {match.group(2)}, NY {match.group(3)}"
             
-            return None
+            return details
             
         except Exception as e:
-            print(f"  Warning: Could not fetch full address: {e}")
+            print(f"  Warning: Could not fetch listing page: {e}")
             return None
     
-    def _build_static_map_url(self, listings):
-        """Build Google Static Maps URL with markers for all listing addresses."""
-        import time
-        import random
-        
+    def _get_placeholder_image(self):
+        """Return a placeholder image URL."""
+        return 'https://via.placeholder.com/600x400/3498db/ffffff?text=No+Image+Available'
+    
+    @staticmethod
+    def _listing_borough(listing):
+        """Return the borough of a listing from its neighborhood, or from its URL's building slug; None if unknown."""
+        import re
+
+        from .areas import get_area_boroughs
+
+        borough = get_area_boroughs().get(listing.get('neighborhood'))
+        if borough is None:
+            # Building slugs end with the borough, e.g. "/building/100-fifth-avenue-new_york/7b"
+            match = re.search(r'/building/[^/]*-(new_york|brooklyn|queens|bronx|staten_island)/', listing.get('url') or '')
+            if match:
+                borough = EmailNotifier.slug_boroughs[match.group(1)]
+        return borough
+
+    @staticmethod
+    def _address_borough(full_address):
+        """Return the borough named in a full address such as "100 5th Avenue, Brooklyn, NY 11217"."""
+        import re
+
+        match = re.search(r',\s*(Manhattan|Bronx|Brooklyn|Queens|Staten Island)\s*,\s*NY\b', full_address or '')
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _marker_keys(listing):
+        """Return the marker cache keys of a listing: its building slug and its normalized street address and borough.
+
+        Every unit in a building shares these keys, so a building only needs to be resolved once. The same street
+        address exists in several boroughs, so the address key is only used when the borough is known.
+        """
+        import re
+
+        keys = []
+        match = re.search(r'/building/([^/]+)/', listing.get('url') or '')
+        if match:
+            keys.append(f'building:{match.group(1)}')
+        address = listing.get('address')
+        borough = EmailNotifier._listing_borough(listing)
+        if address and address != 'N/A' and borough:
+            # Drop the unit ("#4A") and punctuation so that every unit maps to the same building address
+            street = re.sub(r'[^\w\s]', ' ', address.split('#')[0].lower())
+            keys.append(f"address:{' '.join(street.split())}, {borough.lower()}")
+        return keys
+
+    def _build_static_map_url(self, listings, details=None):
+        """Build Google Static Maps URL with markers for all listing addresses.
+
+        Full addresses of previously mapped buildings come from the persistent marker cache. Only cache misses
+        need listing page details, which are fetched here unless `details` already holds them.
+        """
         if not self.maps_api_key or not listings:
             return None
         
         # Take up to 8 listings for the map
         map_listings = listings[:8]
+        keys = {listing['listing_id']: self._marker_keys(listing) for listing in map_listings}
+        cached = self.db.get_map_markers([key for k in keys.values() for key in k]) if self.db else {}
+
+        def cached_address(listing):
+            # Never pin a listing to an address in another borough
+            borough = self._listing_borough(listing)
+            return next(
+                (
+                    cached[key] for key in keys[listing['listing_id']]
+                    if key in cached and borough in (None, self._address_borough(cached[key]))
+                ),
+                None,
+            )
+
+        misses = [listing for listing in map_listings if cached_address(listing) is None]
+        if misses and details is None:
+            details = self._get_listing_details(misses)
+        details = details or {}
+
+        # Remember newly resolved buildings for future emails
+        resolved = {}
+        for listing in misses:
+            full_address = details.get(listing['listing_id'], {}).get('full_address')
+            if full_address:
+                resolved.update((key, full_address) for key in keys[listing['listing_id']])
+        if self.db and resolved:
+            self.db.save_map_markers(resolved)
+        cached.update(resolved)
         
         # Build markers parameter
         markers = []
-        for i, listing in enumerate(map_listings):
-            # Add random delay between address fetches (except for first one)
-            if i > 0:
-                delay = random.uniform(1.0, 2.5)
-                time.sleep(delay)
-            
-            # Get full address with ZIP from listing page for accurate geocoding
-            full_address = self._get_full_address_with_zip(listing['url'])
+        for listing in map_listings:
+            # Use the full address with ZIP for accurate geocoding
+            full_address = cached_address(listing)
             
             if full_address:
                 markers.append(f"markers=color:red%7C{quote(full_address)}")
@@ -233,8 +386,19 @@ class EmailNotifier:
 
         return map_url
 
-    def _send_email(self, subject, html_body, text_body):
-        """Send email via SMTP with HTML and plain text alternatives."""
+    def connect(self):
+        """Open an SMTP connection, upgraded to TLS and logged in, that can send any number of messages."""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        try:
+            server.starttls()
+            server.login(self.sender_email, self.sender_password)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    def build_message(self, subject, html_body, text_body):
+        """Build the email with HTML and plain text alternatives."""
         message = MIMEMultipart('alternative')
         message['From'] = self.sender_email
         message['To'] = self.recipient_email
@@ -243,8 +407,9 @@ class EmailNotifier:
         # Attach both plain text and HTML versions
         message.attach(MIMEText(text_body, 'plain'))
         message.attach(MIMEText(html_body, 'html'))
+        return message
 
-        with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30) as server:
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
-            server.send_message(message)
+    def _send_email(self, subject, html_body, text_body):
+        """Send email via SMTP with HTML and plain text alternatives."""
+        with self.connect() as server:
+            server.send_message(self.build_message(subject, html_body, text_body))
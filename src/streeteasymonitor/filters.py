@@ -0,0 +1,88 @@
+from functools import lru_cache
+import re
+
+
+def trie_pattern(literals: list[str]) -> str:
+    """Return a regex matching any of the literals, with shared prefixes factored out.
+
+    `re` tries a flat alternation one branch at a time at every position, so hundreds of rules cost
+    hundreds of comparisons per character. Nesting the branches by prefix lets it rule most of them
+    out on the first character. Where one literal extends another, the longer one wins.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if end else body
+
+    return build(trie)
+
+
+class FilterMatcher:
+    """Blocklist rules from `Config.filters`, compiled once into a single pattern per field.
+
+    String rules for a field become one prefix-trie regex, so a listing is checked with a single scan of
+    each field however many rules there are. Boolean rules (e.g. `is_featured`) match by equality.
+    """
+
+    def __init__(self, rules: tuple, ignore_case: bool = False) -> None:
+        """Compile the rules.
+
+        Args:
+            rules (tuple): `(field, values)` pairs, as produced by `FilterMatcher.snapshot`.
+            ignore_case (bool): Whether string rules match regardless of case.
+        """
+        self.ignore_case = ignore_case
+        self.flags = {}
+        self.patterns = {}
+        self.originals = {}
+
+        for key, values in rules:
+            flags = [value for value in values if isinstance(value, bool)]
+            strings = [str(value) for value in values if not isinstance(value, bool)]
+            if flags:
+                self.flags[key] = frozenset(flags)
+            if strings:
+                self.patterns[key] = re.compile(trie_pattern(strings), re.IGNORECASE if ignore_case else 0)
+                self.originals[key] = {self._normalize(value): value for value in strings}
+
+    def _normalize(self, text: str) -> str:
+        return text.casefold() if self.ignore_case else text
+
+    @staticmethod
+    def snapshot(filters: dict) -> tuple:
+        """Return a hashable copy of a filters mapping, used as the compile cache key."""
+        return tuple((key, tuple(values)) for key, values in filters.items())
+
+    def match(self, target: dict) -> tuple[str, object]:
+        """Return the `(field, rule)` of the first rule the listing matches, or None if it matches none."""
+        for key, flags in self.flags.items():
+            value = target.get(key, '')
+            if isinstance(value, bool) and value in flags:
+                return key, value
+
+        for key, pattern in self.patterns.items():
+            value = target.get(key, '')
+            if isinstance(value, bool):
+                continue
+            found = pattern.search(str(value))
+            if found:
+                text = found.group()
+                return key, self.originals[key].get(self._normalize(text), text)
+
+        return None
+
+
+@lru_cache(maxsize=8)
+def compile_filters(rules: tuple, ignore_case: bool = False) -> FilterMatcher:
+    """Return the compiled matcher for a filters snapshot, compiling it only the first time it is seen."""
+    return FilterMatcher(rules, ignore_case)
@@ -0,0 +1,170 @@
+from array import array
+from functools import lru_cache
+import json
+import math
+
+from .areas import AREAS_PATH
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> array:
+    """Decode a Google encoded polyline into a flat array of alternating latitudes and longitudes."""
+    coordinates = array('d')
+    factor = 10 ** precision
+    index = lat = lon = 0
+    length = len(encoded)
+
+    while index < length:
+        for axis in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            delta = ~(result >> 1) if result & 1 else result >> 1
+            if axis == 0:
+                lat += delta
+            else:
+                lon += delta
+        coordinates.append(lat / factor)
+        coordinates.append(lon / factor)
+
+    return coordinates
+
+
+def contains(ring: array, lat: float, lon: float) -> bool:
+    """Return whether a point lies inside a polygon ring given as alternating latitudes and longitudes."""
+    inside = False
+    count = len(ring)
+    lat_j, lon_j = ring[count - 2], ring[count - 1]
+    for i in range(0, count, 2):
+        lat_i, lon_i = ring[i], ring[i + 1]
+        if (lat_i > lat) != (lat_j > lat) and lon < (lon_j - lon_i) * (lat - lat_i) / (lat_j - lat_i) + lon_i:
+            inside = not inside
+        lat_j, lon_j = lat_i, lon_i
+    return inside
+
+
+def _orientation(ay: float, ax: float, by: float, bx: float, cy: float, cx: float) -> float:
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+class AreaIndex:
+    """A uniform grid over StreetEasy's area boundaries answering which areas contain a point.
+
+    Each grid cell lists the areas whose bounding box overlaps it. The first lookup in a cell resolves
+    every candidate against that cell: areas that cover the whole cell match without any geometry,
+    areas that miss it are dropped, and areas whose boundary crosses it keep only the few edges inside
+    the cell. A point then matches if its segment to the cell center crosses those edges an odd number
+    of times relative to the center, so a lookup never walks a full borough boundary.
+
+    Attributes:
+        cell_size (float): Grid cell size in degrees (about 550 m of latitude at 0.005).
+    """
+
+    cell_size = 0.005
+
+    def __init__(self, areas: list[dict]) -> None:
+        """Decode the boundaries and build the grid.
+
+        Args:
+            areas (list[dict]): StreetEasy area records as found in areas.json. Areas without a boundary are skipped.
+        """
+        self.ids = []
+        self.rings = []
+        self.bounds = []
+        self.cells = {}
+        self._resolved = {}
+
+        for area in areas:
+            encoded = (area.get('map_coordinates') or {}).get('encoded_boundary')
+            if not encoded:
+                continue
+            ring = decode_polyline(encoded)
+            if len(ring) < 6:
+                continue
+            lats, lons = ring[0::2], ring[1::2]
+            bounds = (min(lats), min(lons), max(lats), max(lons))
+
+            position = len(self.ids)
+            self.ids.append(str(area['id']))
+            self.rings.append(ring)
+            self.bounds.append(bounds)
+
+            min_row, min_col = self._cell(bounds[0], bounds[1])
+            max_row, max_col = self._cell(bounds[2], bounds[3])
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    self.cells.setdefault((row, col), []).append(position)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def _resolve(self, cell: tuple[int, int]) -> tuple:
+        """Return the cell's candidates as `(id, center_inside, edges)` tuples, computing them on first use."""
+        resolved = self._resolved.get(cell)
+        if resolved is not None:
+            return resolved
+
+        row, col = cell
+        south, west = row * self.cell_size, col * self.cell_size
+        north, east = south + self.cell_size, west + self.cell_size
+        center_lat, center_lon = south + self.cell_size / 2, west + self.cell_size / 2
+
+        entries = []
+        for position in self.cells.get(cell, ()):
+            ring = self.rings[position]
+            edges = array('d')
+            lat_j, lon_j = ring[-2], ring[-1]
+            for i in range(0, len(ring), 2):
+                lat_i, lon_i = ring[i], ring[i + 1]
+                if (min(lat_i, lat_j) <= north and max(lat_i, lat_j) >= south
+                        and min(lon_i, lon_j) <= east and max(lon_i, lon_j) >= west):
+                    edges.extend((lat_j, lon_j, lat_i, lon_i))
+                lat_j, lon_j = lat_i, lon_i
+
+            center_inside = contains(ring, center_lat, center_lon)
+            if edges or center_inside:
+                entries.append((self.ids[position], center_inside, edges))
+
+        resolved = (center_lat, center_lon, tuple(entries))
+        self._resolved[cell] = resolved
+        return resolved
+
+    @staticmethod
+    def _crossings(edges: array, lat: float, lon: float, center_lat: float, center_lon: float) -> bool:
+        """Return whether the segment from the point to the cell center crosses the edges an odd number of times."""
+        odd = False
+        for i in range(0, len(edges), 4):
+            a_lat, a_lon, b_lat, b_lon = edges[i], edges[i + 1], edges[i + 2], edges[i + 3]
+            d1 = _orientation(a_lat, a_lon, b_lat, b_lon, lat, lon)
+            d2 = _orientation(a_lat, a_lon, b_lat, b_lon, center_lat, center_lon)
+            if (d1 > 0) == (d2 > 0):
+                continue
+            d3 = _orientation(lat, lon, center_lat, center_lon, a_lat, a_lon)
+            d4 = _orientation(lat, lon, center_lat, center_lon, b_lat, b_lon)
+            if (d3 > 0) != (d4 > 0):
+                odd = not odd
+        return odd
+
+    def areas_at(self, lat: float, lon: float) -> list[str]:
+        """Return the IDs of every area whose boundary contains the point."""
+        center_lat, center_lon, entries = self._resolve(self._cell(lat, lon))
+        return [
+            area_id
+            for area_id, center_inside, edges in entries
+            if center_inside != (bool(edges) and self._crossings(edges, lat, lon, center_lat, center_lon))
+        ]
+
+    def locate(self, points: list[tuple[float, float]]) -> list[list[str]]:
+        """Return the containing area IDs for each `(lat, lon)` point, in order."""
+        return [self.areas_at(lat, lon) for lat, lon in points]
+
+
+@lru_cache(maxsize=None)
+def get_area_geometry() -> AreaIndex:
+    """Decode the boundaries in areas.json once per process and return the spatial index."""
+    with open(AREAS_PATH, 'r') as f:
+        return AreaIndex(json.load(f))
@@ -1,18 +1,40 @@
+from urllib.parse import urlsplit
+
 import requests
 
 from src.streeteasymonitor.search import Search
 from src.streeteasymonitor.database import Database
-from src.streeteasymonitor.email_notifier import EmailNotifier
 from src.streeteasymonitor.config import Config
+from src.streeteasymonitor.ratelimit import AdaptiveRateLimiter
+from src.streeteasymonitor.session_store import SessionStore
+from src.streeteasymonitor.utils import get_base_url, get_datetime
 
 
 class Monitor:
-    def __init__(self, **kwargs):
-        self.config = Config()
-        self.db = Database()
+    def __init__(self, config=None, db=None, session=None, limiter=None, **kwargs):
+        """Set up one search, optionally on resources shared with other monitors.
+
+        Args:
+            config (Config, optional): Shared configuration; created if omitted.
+            db (Database, optional): Shared database; created (and closed on exit) if omitted.
+            session (requests.Session, optional): Shared HTTP session; created (and closed on exit) if omitted.
+            limiter (AdaptiveRateLimiter, optional): Shared request rate limit and cooldown; created if omitted.
+            **kwargs: Search parameters as produced by `Config.get_search_params`.
+        """
+        self.config = config or Config()
+        self.owns_db = db is None
+        self.db = db or Database()
 
-        self.session = requests.Session()
-        self.session.headers.update(self.config.get_headers())
+        self.owns_session = session is None
+        if self.owns_session:
+            session = requests.Session()
+            # Continue a recent session with its cookies and header profile, like a returning visitor
+            self.session_store = SessionStore()
+            if not self.session_store.load(session):
+                session.headers.update(self.config.get_headers())
+        self.session = session
+        self.owns_limiter = limiter is None
+        self.limiter = limiter or AdaptiveRateLimiter(Search.request_delay, key=urlsplit(get_base_url()).netloc)
 
         self.kwargs = kwargs
 
@@ -20,10 +42,50 @@ class Monitor:
         return self
 
     def __exit__(self, *args, **kwargs):
-        self.session.close()
+        if self.owns_session:
+            self.session_store.persist(self.session, blocked=self.blocked)
+            self.session.close()
+        if self.owns_limiter:
+            self.limiter.close()
+        if self.owns_db:
+            self.db.close()
+
+    @property
+    def blocked(self):
+        """Whether StreetEasy answered the last search with 403 Forbidden."""
+        search = getattr(self, 'search', None)
+        return search is not None and search.stats['statuses'][403] > 0
 
     def run(self):
         """Fetch new listings and return them. Caller handles email/DB insertion."""
         self.search = Search(self)
         self.listings = self.search.fetch()
         return self.listings
+
+    def save_state(self):
+        """Remember the last search's fetched pages so unchanged pages can be skipped next run."""
+        search = getattr(self, 'search', None)
+        if search is not None:
+            search.save_state()
+
+    def notify(self, listings):
+        """Save listings to the database and queue one notification per new listing in the same transaction.
+
+        The emails are sent later by an `OutboxSender`, so a run ends as soon as its listings are committed.
+        """
+        if not listings:
+            self.save_state()
+            return
+
+        print(f'{get_datetime()} Found {len(listings)} listings')
+        # Insert all listings into database FIRST to prevent duplicates on retry
+        new_ids = self.db.insert_listings(listings, enqueue=True, profile=self.kwargs.get('name') or '')
+        self.save_state()
+        listings = [listing for listing in listings if listing['listing_id'] in new_ids]
+        for listing in listings:
+            print(f'{get_datetime()} ✓ Saved listing: {listing["listing_id"]} ({listing["address"]})')
+        if not listings:
+            print(f'{get_datetime()} All listings were already saved - no email queued\n')
+            return
+
+        print(f'{get_datetime()} Queued {len(listings)} listing(s) for notification\n')
@@ -0,0 +1,93 @@
+from .config import Config
+from .email_notifier import EmailNotifier
+from .utils import get_datetime
+
+
+class OutboxSender:
+    """Sends the notifications queued in the database's outbox, one email per search profile.
+
+    A drain claims due entries in batches and sends every email of the drain over one SMTP connection. Entries
+    are only marked sent after the server accepted their email; a failed email is rescheduled with exponential
+    backoff and retried on a later drain, so a notification is never dropped.
+
+    Attributes:
+        batch_size (int): Outbox entries claimed at a time.
+    """
+
+    batch_size = 100
+
+    def __init__(self, db, config=None, limiter=None):
+        """Initialize the sender.
+
+        Args:
+            db (Database): Database holding the outbox.
+            config (Config, optional): Configuration providing the SMTP settings; created if omitted.
+            limiter (AdaptiveRateLimiter, optional): Limiter for the listing page fetches of the email bodies.
+        """
+        self.db = db
+        self.config = config or Config()
+        self.limiter = limiter
+
+    @staticmethod
+    def to_listing(entry):
+        """Return an outbox entry as a listing for the email templates, with prices shown as whole dollars."""
+        price = entry['price']
+        return {**entry, 'price': f'{price:.0f}' if isinstance(price, float) else price}
+
+    def drain(self):
+        """Send every notification that is due.
+
+        Stops early once an email fails, leaving the rest for the next drain rather than hammering a failing server.
+
+        Returns:
+            int: Number of listings notified.
+        """
+        notifier = EmailNotifier(self.config.get_email_config(), db=self.db, limiter=self.limiter)
+        server = None
+        sent = 0
+
+        try:
+            while True:
+                entries = self.db.claim_outbox(OutboxSender.batch_size)
+                if not entries:
+                    break
+
+                profiles = {}
+                for entry in entries:
+                    profiles.setdefault(entry['profile'], []).append(OutboxSender.to_listing(entry))
+
+                failed = False
+                for profile, listings in profiles.items():
+                    ids = [listing['outbox_id'] for listing in listings]
+                    try:
+                        message = notifier.build_message(*notifier.compose(listings, profile))
+                        if server is None:
+                            server = notifier.connect()
+                        server.send_message(message)
+                    except Exception as e:
+                        print(f'{get_datetime()} Error sending notification for {len(ids)} listing(s), will retry: {e}')
+                        self.db.fail_outbox(ids, e)
+                        server = self.disconnect(server)
+                        failed = True
+                        continue
+
+                    self.db.complete_outbox(ids)
+                    sent += len(ids)
+                    print(f'{get_datetime()} Email sent with {len(ids)} listing(s){f" for {profile}" if profile else ""}')
+
+                if failed:
+                    break
+        finally:
+            self.disconnect(server)
+
+        return sent
+
+    @staticmethod
+    def disconnect(server):
+        """Close an SMTP connection, ignoring errors from an already broken one. Always returns None."""
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+        return None
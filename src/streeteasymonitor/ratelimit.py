@@ -0,0 +1,264 @@
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+import os
+import sqlite3
+import threading
+import time
+
+
+class RateLimiter:
+    """A thread-safe limiter spacing requests at least `min_interval` seconds apart.
+
+    One instance can be shared by every search running in a process so that concurrent profiles
+    never hit StreetEasy faster than a single search would.
+    """
+
+    def __init__(self, min_interval: float) -> None:
+        """Initialize the limiter.
+
+        Args:
+            min_interval (float): Minimum number of seconds between the start of two requests.
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        """Block until the caller may send its next request."""
+        self.acquire()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Reserve the next request slot and wait for it, unless that would take longer than `timeout` seconds.
+
+        Returns:
+            bool: Whether a slot was reserved.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            if timeout is not None and slot - now > timeout:
+                return False
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+        return True
+
+    def record(self, status: int, retry_after: str = None) -> None:
+        """Ignore a response; the fixed limiter does not adapt."""
+
+    def cooldown_remaining(self) -> float:
+        """Return 0 - the fixed limiter never cools down."""
+        return 0.0
+
+
+class TokenBucket:
+    """A thread-safe token bucket allowing bursts of up to `capacity` requests at an average of `rate` per second."""
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        """Initialize a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum number of tokens the bucket holds.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Take one token, waiting for it if necessary.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Waits indefinitely if omitted.
+
+        Returns:
+            bool: Whether a token was taken before the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+def parse_retry_after(value: str) -> float:
+    """Return the seconds a `Retry-After` header asks for (given as seconds or an HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """A token bucket and circuit breaker whose state lives in SQLite, shared by every thread and process.
+
+    The bucket starts at one request per `min_interval` seconds. A 403 or 429 halves the rate and opens a cooldown,
+    either as long as the response's `Retry-After` or doubling with each consecutive block. Every success then adds
+    back a small step of rate. While a cooldown is open, `cooldown_remaining` tells callers to stay off the network,
+    and the next run started by cron sees the same state.
+
+    Attributes:
+        min_rate (float): Lowest requests per second the bucket shrinks to.
+        increase_step (float): Share of the full rate added back after each successful response.
+        decrease_factor (float): Rate multiplier applied on each block.
+        base_cooldown (float): Cooldown after a block without `Retry-After`, doubled per consecutive block.
+        max_cooldown (float): Longest cooldown.
+        busy_timeout (float): Seconds to wait for another process holding the state's write lock.
+    """
+
+    min_rate = 1 / 60
+    increase_step = 0.05
+    decrease_factor = 0.5
+    base_cooldown = 5.0
+    max_cooldown = 60 * 60.0
+    busy_timeout = 10.0
+
+    def __init__(self, min_interval: float, key: str = 'streeteasy.com', db_path: str = None) -> None:
+        """Initialize the limiter.
+
+        Args:
+            min_interval (float): Seconds between requests at the full rate.
+            key (str): Name of the shared bucket, normally the host it limits.
+            db_path (str, optional): State database, defaulting to `data/ratelimit.sqlite3` next to the listings.
+        """
+        self.max_rate = 1 / min_interval
+        self.key = key
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..', 'data')
+        self.db_path = db_path or os.path.join(data_dir, 'ratelimit.sqlite3')
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._local = threading.local()
+
+        with self.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT PRIMARY KEY,
+                    rate REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    cooldown_until REAL NOT NULL DEFAULT 0,
+                    blocks INTEGER NOT NULL DEFAULT 0,
+                    last_block_at REAL
+                )
+            ''')
+            conn.execute(
+                'INSERT OR IGNORE INTO buckets (key, rate, tokens, updated_at) VALUES (?, ?, 1, ?)',
+                (self.key, self.max_rate, time.time()),
+            )
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=AdaptiveRateLimiter.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def state(self) -> dict:
+        """Return the bucket's current row."""
+        row = self.conn.execute('SELECT * FROM buckets WHERE key = ?', (self.key,)).fetchone()
+        return dict(row)
+
+    def wait(self) -> None:
+        """Block until the caller may send its next request, including until any cooldown is over."""
+        self.acquire()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Reserve a token and wait for it, unless that would take longer than `timeout` seconds.
+
+        Reservations may drive the token count negative, so concurrent callers queue up behind each other
+        instead of all waking at the same moment.
+
+        Returns:
+            bool: Whether a token was reserved.
+        """
+        with self.transaction() as conn:
+            row = conn.execute('SELECT * FROM buckets WHERE key = ?', (self.key,)).fetchone()
+            now = time.time()
+            # Tokens only accrue outside cooldowns
+            start = max(now, row['cooldown_until'])
+            tokens, updated = row['tokens'], row['updated_at']
+            if start > updated:
+                tokens = min(1.0, tokens + (start - updated) * row['rate'])
+                updated = start
+            wait = updated + max(0.0, 1 - tokens) / row['rate'] - now
+
+            if timeout is not None and wait > timeout:
+                return False
+            conn.execute(
+                'UPDATE buckets SET tokens = ?, updated_at = ? WHERE key = ?', (tokens - 1, updated, self.key)
+            )
+
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def record(self, status: int, retry_after: str = None) -> None:
+        """Adapt to a response: shrink the rate and open a cooldown on 403/429, grow the rate back on success."""
+        if status in (403, 429):
+            with self.transaction() as conn:
+                row = conn.execute('SELECT * FROM buckets WHERE key = ?', (self.key,)).fetchone()
+                now = time.time()
+                blocks = row['blocks'] + 1
+                cooldown = parse_retry_after(retry_after)
+                if cooldown is None:
+                    cooldown = AdaptiveRateLimiter.base_cooldown * 2 ** (blocks - 1)
+                cooldown = min(cooldown, AdaptiveRateLimiter.max_cooldown)
+                conn.execute(
+                    '''
+                    UPDATE buckets
+                    SET rate = ?, blocks = ?, last_block_at = ?, cooldown_until = MAX(cooldown_until, ?),
+                        updated_at = MAX(updated_at, ?)
+                    WHERE key = ?
+                    ''',
+                    (max(AdaptiveRateLimiter.min_rate, row['rate'] * AdaptiveRateLimiter.decrease_factor),
+                     blocks, now, now + cooldown, now + cooldown, self.key),
+                )
+        elif 200 <= status < 400:
+            with self.transaction() as conn:
+                conn.execute(
+                    'UPDATE buckets SET rate = MIN(?, rate + ?), blocks = 0 WHERE key = ? AND (rate < ? OR blocks > 0)',
+                    (self.max_rate, self.max_rate * AdaptiveRateLimiter.increase_step, self.key, self.max_rate),
+                )
+
+    def cooldown_remaining(self) -> float:
+        """Return the seconds left before requests may resume, or 0 if no cooldown is open."""
+        row = self.conn.execute('SELECT cooldown_until FROM buckets WHERE key = ?', (self.key,)).fetchone()
+        return max(0.0, row['cooldown_until'] - time.time())
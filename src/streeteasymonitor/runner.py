@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import Config
+from .database import Database
+from .monitor import Monitor
+from .outbox import OutboxSender
+from .ratelimit import AdaptiveRateLimiter
+from .scheduler import single_flight
+from .search import Search
+from .session_store import SessionStore
+from .utils import get_base_url, get_datetime
+
+
+class ProfileRunner:
+    """Runs search profiles concurrently on one database, HTTP connection pool and request rate limit.
+
+    The shared resources stay open between runs, so one runner can serve every tick of a long-running process.
+    Each run's notifications are sent from the outbox on a background thread once the run's listings are stored.
+    """
+
+    def __init__(self, profiles, max_workers=4, config=None, outbox_lock_path=None):
+        """Set up the shared resources.
+
+        Args:
+            profiles (list[dict]): Search parameters per profile, as produced by `Config.get_search_params`.
+            max_workers (int): Maximum number of profiles searched at the same time.
+            config (Config, optional): Shared configuration; created if omitted.
+            outbox_lock_path (str, optional): Lock held while draining the outbox, shared with `main.py --send`, so
+                only one process on the machine sends notifications at a time.
+        """
+        self.profiles = profiles
+        if len(profiles) > 1:
+            # Every profile gets its own email, labelled with its areas unless the profile is named
+            self.profiles = [{'name': ', '.join(profile.get('areas', [])), **profile} for profile in profiles]
+        self.max_workers = max(1, min(max_workers, len(profiles)))
+        self.config = config or Config()
+        self.db = Database()
+        self.limiter = AdaptiveRateLimiter(Search.request_delay, key=urlsplit(get_base_url()).netloc)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session_store = SessionStore()
+        if not self.session_store.load(self.session):
+            self.session.headers.update(self.config.get_headers())
+        self.blocked = False
+
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.sender = OutboxSender(self.db, self.config, self.limiter)
+        self.sender_pool = ThreadPoolExecutor(max_workers=1)
+        self.outbox_lock_path = outbox_lock_path
+        self._drain = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown()
+        self.sender_pool.shutdown()
+        self.session.close()
+        self.limiter.close()
+        self.db.close()
+
+    def run_profile(self, profile):
+        """Search one profile and queue its own notification."""
+        with Monitor(config=self.config, db=self.db, session=self.session, limiter=self.limiter, **profile) as monitor:
+            listings = monitor.run()
+            self.blocked = self.blocked or monitor.blocked
+            monitor.notify(listings)
+            return listings
+
+    def run(self):
+        """Run every profile once.
+
+        Returns:
+            list: Each profile's new listings, or None where that profile failed.
+        """
+        futures = [self.pool.submit(self.run_profile, profile) for profile in self.profiles]
+        results = []
+        for i, future in enumerate(futures, 1):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f'{get_datetime()} Profile {i}/{len(self.profiles)} failed: {e}')
+                results.append(None)
+
+        print(f'{get_datetime()} Finished {len(self.profiles)} profiles ({results.count(None)} failed)')
+        self.session_store.persist(self.session, blocked=self.blocked)
+        self.blocked = False
+        self.send_notifications()
+        return results
+
+    def send_notifications(self):
+        """Start draining the outbox in the background, unless a drain is already running.
+
+        Returns:
+            concurrent.futures.Future: The drain, resolving to the number of listings notified.
+        """
+        if self._drain is None or self._drain.done():
+            self._drain = self.sender_pool.submit(self.drain)
+        return self._drain
+
+    def drain(self):
+        try:
+            if self.outbox_lock_path is None:
+                return self.sender.drain()
+            with single_flight(self.outbox_lock_path) as acquired:
+                if not acquired:
+                    # The other sender picks up this run's notifications too
+                    print(f'{get_datetime()} Another process is sending notifications - skipping')
+                    return 0
+                return self.sender.drain()
+        except Exception as e:
+            print(f'{get_datetime()} Error sending notifications: {e}')
+            return 0
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+import os
+import random
+import signal
+import threading
+import traceback
+
+from .utils import get_datetime
+
+
+@contextmanager
+def single_flight(lock_path):
+    """Hold an exclusive, non-blocking lock on `lock_path` shared by every process on this machine.
+
+    Yields:
+        bool: Whether the lock was acquired. If not, another run is in progress and the caller should skip.
+    """
+    try:
+        import fcntl
+    except ImportError:  # Windows - no cross-process locking
+        yield True
+        return
+
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'w') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class Scheduler:
+    """Runs a task repeatedly on an in-process jittered schedule until a shutdown signal arrives.
+
+    A tick never overlaps another tick, in this process or in any other process holding the same lock file
+    (such as a leftover cron run). SIGINT and SIGTERM let the current tick finish and then stop the loop.
+    """
+
+    def __init__(self, task, interval, jitter, lock_path):
+        """Initialize the scheduler.
+
+        Args:
+            task (Callable[[], Any]): The work to run each tick.
+            interval (float): Mean number of seconds between ticks.
+            jitter (float): Maximum number of seconds added to or subtracted from each interval.
+            lock_path (str): Lock file preventing overlapping runs across processes.
+        """
+        self.task = task
+        self.interval = interval
+        self.jitter = jitter
+        self.lock_path = lock_path
+        self.ticks = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def next_delay(self):
+        return max(0, self.interval + random.uniform(-self.jitter, self.jitter))
+
+    def tick(self):
+        """Run the task once unless another run is still in progress."""
+        if not self._lock.acquire(blocking=False):
+            print(f'{get_datetime()} Previous run still in progress - skipping tick')
+            return
+        try:
+            with single_flight(self.lock_path) as acquired:
+                if not acquired:
+                    print(f'{get_datetime()} Another process is running a search - skipping tick')
+                    return
+                self.ticks += 1
+                self.task()
+        except Exception as e:
+            # Keep the daemon alive - the next tick gets a fresh attempt
+            print(f'{get_datetime()} Run failed: {e}')
+            traceback.print_exc()
+        finally:
+            self._lock.release()
+
+    def stop(self, *args):
+        """Ask the loop to exit after the current tick."""
+        if not self._stop.is_set():
+            print(f'{get_datetime()} Shutting down after the current run...')
+        self._stop.set()
+
+    def run_forever(self):
+        """Tick until stopped, starting with a short jittered delay instead of a full interval."""
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        delay = random.uniform(0, self.jitter)
+        while not self._stop.wait(delay):
+            self.tick()
+            delay = self.next_delay()
+            if not self._stop.is_set():
+                print(f'{get_datetime()} Next run in {delay / 60:.1f} minutes (pid {os.getpid()})\n')
+        print(f'{get_datetime()} Stopped after {self.ticks} runs')
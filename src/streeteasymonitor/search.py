@@ -1,20 +1,35 @@
+from collections import Counter, defaultdict
+from functools import cached_property
+import hashlib
 import json
 import re
+import time
+from urllib.parse import urlsplit
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
 
+from .areas import expand_areas
 from .config import Config
-from .utils import build_url, get_datetime, get_area_map
+from .filters import FilterMatcher, compile_filters
+from .utils import build_url, get_base_url, get_datetime, get_area_map, get_html_backend
 
 
 class Search:
     """A search based on the current session, database instance, and keyword arguments for constructing a StreetEasy search URL.
 
     Attributes:
-        area_map (dict[str, str]): A mapping of StreetEasy's neighborhood names and corresponding codes used for URL construction.
+        request_delay (float): Seconds to wait between consecutive requests to StreetEasy.
+        max_retries (int): Attempts per results page before giving up.
+        retry_delay (float): Backoff before the first retry, doubled for each further retry.
+        refresh_delay (float): Seconds to wait after revisiting the rentals page before retrying a results page.
+        max_cooldown_wait (float): Longest cooldown after a 403/429 worth waiting out; longer ones end the run.
     """
 
-    area_map: dict[str, str] = get_area_map()
+    request_delay: float = 1.5
+    max_retries: int = 3
+    retry_delay: float = 2.0
+    refresh_delay: float = 2.0
+    max_cooldown_wait: float = 10.0
 
     def __init__(self, monitor) -> None:
         """Initializes the search.
@@ -24,8 +39,11 @@ class Search:
 
         Attributes:
             session (requests.Session): The session instance.
+            limiter (RateLimiter | AdaptiveRateLimiter): Request rate limit and cooldown, possibly shared with other
+                searches and processes.
             db (Database): The database instance.
             kwargs (dict[str, str]): The search parameter components.
+            area_map (dict[str, str]): A mapping of StreetEasy's neighborhood names and corresponding codes used for URL construction.
             codes (list[str, str]): The StreetEasy neighborhood codes corresponding to selected neighborhood names.
 
             price (str): The price range component of the search URL.
@@ -35,22 +53,31 @@ class Search:
             parameters (dict[str, str]): Dictionary mapping query components for URL construction.
             url (str): Search URL for the current query.
             listings (list[dict[str, str]]): Listings corresponding to the current search - initially empty.
+            max_pages (int): Maximum number of results pages to fetch.
+            page_states (dict[str, dict]): Validators and listing fingerprint of each page fetched, saved by `save_state`.
+            unchanged_pages (int): Pages skipped because they had not changed since the previous run.
+            failed_url (str): The results page that could not be fetched, leaving the crawl incomplete, if any.
+            rejected (set[str]): Listing IDs turned down by the filters this run, remembered by `save_state`.
+            stats (dict): Request counts, status codes, seconds spent in each fetch branch and each kind of sleep, and
+                the sleeps that were followed by a failed request anyway.
         """
 
         self.session = monitor.session
+        self.limiter = monitor.limiter
         self.db = monitor.db
         self.kwargs = monitor.kwargs
+        self.area_map = get_area_map()
 
         # Validate required parameters
         if not self.kwargs.get('areas'):
             raise ValueError('At least one area must be specified for the search')
 
         # Validate that all areas exist in the area map
-        invalid_areas = [area for area in self.kwargs['areas'] if area not in Search.area_map]
+        invalid_areas = [area for area in self.kwargs['areas'] if area not in self.area_map]
         if invalid_areas:
             raise ValueError(f'Invalid area(s): {", ".join(invalid_areas)}')
 
-        self.codes = [Search.area_map[area] for area in self.kwargs['areas']]
+        self.codes = [self.area_map[area] for area in self.kwargs['areas']]
 
         # Validate price range
         min_price = self.kwargs.get('min_price', 0)
@@ -68,6 +95,10 @@ class Search:
         if max_beds > 0 and min_beds > max_beds:
             raise ValueError('Minimum beds cannot be greater than maximum beds')
 
+        self.max_pages = int(self.kwargs.get('max_pages') or 1)
+        if self.max_pages < 1:
+            raise ValueError('At least one results page must be fetched')
+
         self.area = ','.join(self.codes)
         self.price = f"{self.kwargs['min_price']}-{self.kwargs['max_price']}"
         self.beds = f"{self.kwargs['min_beds']}-{self.kwargs['max_beds']}"
@@ -88,40 +119,204 @@ class Search:
 
         self.url = build_url(**self.parameters)
         self.listings = []
+        self.page_states = {}
+        self.unchanged_pages = 0
+        self.failed_url = None
+        self.rejected = set()
+        self.stats = {
+            'requests': 0,
+            'statuses': Counter(),
+            'branches': defaultdict(float),
+            'sleeps': defaultdict(float),
+            'wasted_sleeps': 0,
+            'wasted_sleep_seconds': 0.0,
+        }
+        self._pending_sleeps = []
 
     def fetch(self) -> list[dict[str, str]]:
-        """Check the search URL for new listings."""
-        import time
+        """Check the search URL for new listings, paging through results up to `max_pages`.
 
+        Results are sorted newest-first, so paging stops early at the first page with no new candidates: every listing
+        is already stored, rejected by the filters (now or on an earlier run) or seen on an earlier page of this run.
+        It carries on when the previous run failed to fetch the next page, whose listings were never checked.
+        """
         print(f'Running script with parameters:\n{json.dumps(self.parameters, indent=2)}\n')
         print(f'URL: {self.url}')
 
+        seen = set()
+        crawled = set()
+        for page in range(1, self.max_pages + 1):
+            if page > 1:
+                self.pause(Search.request_delay, 'page_spacing')  # Space out page requests like the homepage warm-up
+                print(f'{get_datetime()} Fetching page {page}/{self.max_pages}...')
+
+            parser = self.fetch_page(build_url(page=page, **self.parameters), warm_up=page == 1 and not self.has_cookies())
+            # A page the previous run failed to fetch may hold listings nobody has seen, however stale this one is
+            pending = page < self.max_pages and self.is_pending(build_url(page=page + 1, **self.parameters))
+            if parser is None:
+                if self.failed_url or not pending:
+                    break
+                continue
+
+            # The same listing can move onto the next page between requests
+            for listing in parser.listings:
+                if listing['listing_id'] not in seen:
+                    seen.add(listing['listing_id'])
+                    self.listings.append(listing)
+            self.rejected.update(parser.rejected)
+
+            # Only listings that passed the filters are new - the rest will never be stored
+            unseen = [listing['listing_id'] for listing in parser.listings if listing['listing_id'] not in crawled]
+            crawled.update(parser.page_ids)
+            if not unseen and not pending:
+                if page < self.max_pages:
+                    print(f'{get_datetime()} Page {page} has no unseen listings - stopping.')
+                break
+
+        if self.unchanged_pages:
+            print(f'{get_datetime()} Skipped parsing {self.unchanged_pages} unchanged page(s) (conditional GET / fingerprint hit)')
+        if not self.listings:
+            print(f'{get_datetime()} No new listings.\n')
+
+        return self.listings
+
+    def save_state(self) -> None:
+        """Persist the validators and fingerprints of the fetched pages for the next run's short-circuit, and the
+        listings the filters rejected so the next run skips them.
+
+        Called once the run's listings are stored, so that a failed run is never mistaken for an unchanged page.
+        Page states are only saved after a clean crawl: if a later page failed, an earlier page saved as unchanged
+        would stop the next run before it reached the listings the failed page held. The failed page is saved
+        without a fingerprint instead, which makes the next run page through to it (see `fetch`).
+        """
+        if self.failed_url:
+            print(f'{get_datetime()} A page could not be fetched - not saving page states so the next run crawls again')
+            self.db.save_search_state(self.failed_url)
+        else:
+            for url, state in self.page_states.items():
+                self.db.save_search_state(url, **state)
+        if self.rejected:
+            self.db.save_rejected_ids(Parser.scope(self.kwargs), self.rejected)
+
+    def is_pending(self, url: str) -> bool:
+        """Whether the previous run failed to fetch a results page, recorded as a state without a fingerprint."""
+        state = self.db.get_search_state(url)
+        return state is not None and state['fingerprint'] is None
+
+    def has_cookies(self) -> bool:
+        """Return whether the session already holds unexpired StreetEasy cookies, making the homepage warm-up unnecessary."""
+        host = urlsplit(get_base_url()).hostname or ''
+        for cookie in self.session.cookies:
+            domain = cookie.domain.lstrip('.')
+            if (host == domain or host.endswith(f'.{domain}')) and not cookie.is_expired():
+                print(f'{get_datetime()} Reusing session cookies - skipping the homepage warm-up')
+                return True
+        return False
+
+    def get(self, url: str, headers: dict = None):
+        """Send a GET request through the session once the shared rate limit allows it."""
+        start = time.perf_counter()
+        self.limiter.wait()
+        self.stats['sleeps']['rate_limit'] += time.perf_counter() - start
+
+        self.stats['requests'] += 1
+        response = self.session.get(url, headers=headers, timeout=30)
+        self.stats['statuses'][response.status_code] += 1
+        self.limiter.record(response.status_code, response.headers.get('Retry-After'))
+        return response
+
+    def pause(self, seconds: float, reason: str) -> None:
+        """Sleep between requests, recording the time under `reason`."""
+        time.sleep(seconds)
+        self.stats['sleeps'][reason] += seconds
+        self._pending_sleeps.append(seconds)
+
+    def settle(self, branch: str, started: float, success: bool) -> None:
+        """Record how long a fetch attempt spent ending in `branch`.
+
+        The sleeps taken since the last settled attempt count as wasted when the attempt failed anyway.
+        """
+        self.stats['branches'][branch] += time.perf_counter() - started
+        if not success:
+            self.stats['wasted_sleeps'] += len(self._pending_sleeps)
+            self.stats['wasted_sleep_seconds'] += sum(self._pending_sleeps)
+        self._pending_sleeps = []
+
+    def fetch_page(self, url: str, warm_up: bool = False):
+        """Download and parse one results page, retrying with exponential backoff.
+
+        Args:
+            url (str): The results page URL.
+            warm_up (bool): Visit the homepage first to establish cookies like a real user.
+
+        Returns:
+            Parser: The parsed page, or None if it could not be fetched or has not changed since the previous run.
+        """
+        # Ask the server to skip the body if the page has not changed since the previous run
+        state = self.db.get_search_state(url)
+        conditional = {}
+        if state and state['etag']:
+            conditional['If-None-Match'] = state['etag']
+        if state and state['last_modified']:
+            conditional['If-Modified-Since'] = state['last_modified']
+
         # Retry logic with exponential backoff
-        max_retries = 3
-        retry_delay = 2  # seconds
+        max_retries = Search.max_retries
+        base_url = get_base_url()
 
         for attempt in range(max_retries):
+            started = time.perf_counter()
+
+            # A recent 403/429 (possibly seen by another process) opened a cooldown - retrying now only prolongs it
+            cooldown = self.limiter.cooldown_remaining()
+            if cooldown > Search.max_cooldown_wait:
+                print(f'{get_datetime()} StreetEasy cooldown active for another {cooldown:.0f}s - skipping the network\n')
+                self.settle('cooldown', started, success=False)
+                self.failed_url = url
+                return None
+
             try:
                 # Always visit homepage first to establish session like a real user
                 # This helps avoid 403 errors
                 if attempt == 0:
-                    # First attempt - visit homepage to establish cookies
-                    self.session.get('https://streeteasy.com/', timeout=30)
-                    time.sleep(1.5)  # Small delay between requests
+                    if warm_up:
+                        # First attempt - visit homepage to establish cookies
+                        self.get(f'{base_url}/')
+                        self.pause(Search.request_delay, 'warm_up')  # Small delay between requests
                 else:
                     print(f'{get_datetime()} Retry attempt {attempt}/{max_retries - 1}...')
-                    time.sleep(retry_delay * (2 ** (attempt - 1)))  # Exponential backoff
+                    self.pause(Search.retry_delay * (2 ** (attempt - 1)), 'backoff')  # Exponential backoff
                     # Visit homepage again to refresh session
-                    self.session.get('https://streeteasy.com/for-rent/nyc', timeout=30)
-                    time.sleep(2)
+                    self.get(f'{base_url}/for-rent/nyc')
+                    self.pause(Search.refresh_delay, 'refresh')
+
+                self.r = self.get(url, headers=conditional)
+
+                if self.r.status_code == 304:
+                    self.settle('not_modified', started, success=True)
+                    self.unchanged_pages += 1
+                    print(f'{get_datetime()} Page not modified since last run (304) - skipped parsing')
+                    return None
+                elif self.r.status_code == 200:
+                    fingerprint = Parser.fingerprint(self.r.content)
+                    self.page_states[url] = {
+                        'etag': self.r.headers.get('ETag'),
+                        'last_modified': self.r.headers.get('Last-Modified'),
+                        'fingerprint': fingerprint,
+                    }
+                    if state and state['fingerprint'] == fingerprint:
+                        self.settle('unchanged', started, success=True)
+                        self.unchanged_pages += 1
+                        print(f'{get_datetime()} Page lists the same listings as last run - skipped parsing')
+                        return None
 
-                self.r = self.session.get(self.url, timeout=30)
-                
-                if self.r.status_code == 200:
                     parser = Parser(self.r.content, self.db, self.kwargs)
-                    self.listings = parser.listings
-                    break  # Success, exit retry loop
+                    listings = parser.listings
+                    print(f'{get_datetime()} Parsed {parser.card_count} cards ({parser.skipped_count} already known, {len(listings)} new) in {parser.parse_time * 1000:.1f} ms ({parser.backend})')
+                    self.settle('parsed', started, success=True)
+                    return parser
                 elif self.r.status_code in [403, 429]:
+                    self.settle(f'blocked_{self.r.status_code}', started, success=False)
                     print(f'{get_datetime()} Error: Received status code {self.r.status_code}')
                     if attempt < max_retries - 1:
                         print(f'{get_datetime()} Will retry with exponential backoff...\n')
@@ -129,23 +324,22 @@ class Search:
                     else:
                         print(f'{get_datetime()} Max retries reached.\n')
                 else:
+                    self.settle('error', started, success=False)
                     print(f'{get_datetime()} Error: Received status code {self.r.status_code}\n')
-                    break
-                    
+                    self.failed_url = url
+                    return None
+
             except Exception as e:
+                self.settle('exception', started, success=False)
                 print(f'{get_datetime()} Error fetching listings: {e}')
                 if attempt < max_retries - 1:
                     print(f'{get_datetime()} Will retry...\n')
                     continue
                 else:
                     print(f'{get_datetime()} Max retries reached.\n')
-                    self.listings = []
-                    break
 
-        if not self.listings:
-            print(f'{get_datetime()} No new listings.\n')
-
-        return self.listings
+        self.failed_url = url
+        return None
 
 
 class Parser:
@@ -153,61 +347,150 @@ class Parser:
 
     Attributes:
         price_pattern (re.Pattern): Regular expression used for stripping commas and dollar signs from listing price.
+        card_pattern (re.Pattern): Class name pattern identifying listing card wrappers on a results page.
+        link_pattern (re.Pattern): Listing URL pattern capturing the building slug and unit ID.
+        raw_link_pattern (re.Pattern): The same pattern for scanning raw page bytes without building a tree.
+        raw_card_pattern (re.Pattern): Opening tag of a listing card wrapper in raw page bytes.
+        price_text_pattern (re.Pattern): Pattern matching a rendered price such as "$3,500".
+        backend (str): Beautiful Soup tree builder - lxml when installed, otherwise the stdlib html.parser.
+        coordinate_attrs (dict[str, tuple[str, ...]]): Attributes that may carry a card's latitude and longitude,
+            either as data attributes or as schema.org `itemprop` microdata.
     """
 
     price_pattern = re.compile(r'[$,]')
-
-    def __init__(self, content: bytes, db, kwargs: dict = None) -> None:
+    card_pattern = re.compile(r'ListingCardsList_listCardWrapper')
+    link_pattern = re.compile(r'/building/([^/]+)/(\w+)')
+    raw_link_pattern = re.compile(rb'/building/([^/"\'\s?#<>]+)/(\w+)')
+    raw_card_pattern = re.compile(rb'<li\b[^>]*ListingCardsList_listCardWrapper')
+    price_text_pattern = re.compile(r'\$[\d,]+')
+    backend = get_html_backend()
+    coordinate_attrs = {
+        'latitude': ('data-latitude', 'data-lat'),
+        'longitude': ('data-longitude', 'data-lng', 'data-lon'),
+    }
+
+    def __init__(self, content: bytes, db, kwargs: dict = None, backend: str = None) -> None:
         """Initialize the parse object.
 
         Args:
             content (bytes): HTML content of a successful GET request to the search URL.
-            db (Database): Database instance used for fetching listing IDs that already exist in the database.
+            db (Database): Database instance used for checking which of the page's listing IDs are already stored.
             kwargs (dict): Search parameters including areas for filtering.
+            backend (str, optional): Beautiful Soup tree builder overriding the class default.
 
         Attributes:
-            soup (bs4.BeautifulSoup): Beautiful Soup object for parsing HTML contents.
-            existing_ids (list[str]): Listing IDs that have already been stored in the database.
+            soup (bs4.BeautifulSoup): Beautiful Soup object holding only the listing card subtrees.
+            page_ids (list[str]): Listing IDs of the page's cards, in page order, found by a regex pre-pass.
+            existing_ids (set[str]): Listing IDs from this page that have already been stored in the database.
+            scope (str): Key of the search areas and filter rules, under which rejected listings are remembered.
+            rejected_ids (set[str]): Listing IDs from this page the same filters rejected on an earlier run.
+            rejected (list[str]): Listing IDs from this page rejected now by the search areas or a blocklist rule, to
+                be remembered. Cards that fail to parse or match only a flag rule such as `is_featured` are not
+                remembered, as the same listing may parse or show up unpromoted later.
             kwargs (dict): Search parameters for filtering.
+            parse_time (float): Seconds spent building the tree and extracting cards for this page.
+            card_count (int): Number of listing cards on the page.
+            new_ids (list[str]): Page listing IDs that are neither stored in the database nor previously rejected.
+            skipped_count (int): Number of cards skipped without full extraction because their listing is known
+                or was rejected before.
+            located (dict[str, set[str]]): IDs of the areas containing each listing that exposed its coordinates.
+            matcher (FilterMatcher): `Config.filters` compiled into one pattern per field.
         """
 
-        self.soup = BeautifulSoup(content, 'html.parser')
-        self.existing_ids = db.get_existing_ids()
-        self.kwargs = kwargs or {}
+        if backend:
+            self.backend = backend
 
-    def parse(self, card) -> dict[str, str]:
-        """Parse the contents of one listing."""
-        # Find the link to get URL and extract listing ID from it
-        link = card.find('a', href=re.compile(r'/building/[^/]+/\w+'))
+        start = time.perf_counter()
+        self.kwargs = kwargs or {}
+        self.card_count = 0
+        self.skipped_count = 0
+        self.located = {}
+        self.rejected = []
+        self.matcher = compile_filters(FilterMatcher.snapshot(Config.filters), Config.filter_ignore_case)
+        self.scope = Parser.scope(self.kwargs)
+
+        self.page_ids = Parser.scan_ids(content)
+        self.existing_ids = db.get_known_ids(self.page_ids)
+        self.rejected_ids = db.get_rejected_ids(self.scope, self.page_ids)
+
+        # Newest-first results are mostly known or filtered-out listings - only build a tree if something is new
+        self.new_ids = [
+            listing_id for listing_id in self.page_ids
+            if listing_id not in self.existing_ids and listing_id not in self.rejected_ids
+        ]
+        self.soup = None
+        if self.new_ids:
+            strainer = SoupStrainer('li', class_=Parser.card_pattern)
+            self.soup = BeautifulSoup(content, self.backend, parse_only=strainer)
+        self.parse_time = time.perf_counter() - start
+
+    @staticmethod
+    def scan_ids(content: bytes) -> list[str]:
+        """Return the unique listing IDs of the cards in raw page content, in page order.
+
+        Like `listing_id`, each card's ID comes from the first unit link after the card's opening tag, so links
+        elsewhere on the page (navigation, footer, embedded data) are ignored.
+        """
+        if isinstance(content, str):
+            content = content.encode()
+        starts = [match.start() for match in Parser.raw_card_pattern.finditer(content)]
+        ids = []
+        for start, end in zip(starts, starts[1:] + [len(content)]):
+            match = Parser.raw_link_pattern.search(content, start, end)
+            if match:
+                ids.append(f'{match.group(1).decode()}_{match.group(2).decode()}')
+        return list(dict.fromkeys(ids))
+
+    @staticmethod
+    def scope(kwargs: dict) -> str:
+        """Return a key of the search areas and filter rules, which together decide whether a listing is rejected."""
+        rules = [sorted(kwargs.get('areas') or []), FilterMatcher.snapshot(Config.filters), Config.filter_ignore_case]
+        return hashlib.sha1(json.dumps(rules, default=str).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def fingerprint(content: bytes) -> str:
+        """Return a hash of the ordered listing IDs linked from raw page content."""
+        return hashlib.sha1('\n'.join(Parser.scan_ids(content)).encode()).hexdigest()
+
+    def listing_id(self, card) -> str:
+        """Return the listing ID of a card from its unit link alone, or None if it has none."""
+        link = card.find('a', href=Parser.link_pattern)
         if not link:
             return None
-        
-        url = link['href']
-        # Extract building slug and unit ID from URL (e.g., /building/foo-bar/123)
-        match = re.search(r'/building/([^/]+)/(\w+)', url)
-        if match:
-            building_slug = match.group(1)
-            unit_id = match.group(2)
-            listing_id = f"{building_slug}_{unit_id}"
-        else:
-            return None
-        
-        # Find price (look for span with $ symbol)
-        price_elem = None
-        for elem in card.find_all('span'):
-            text = elem.get_text(strip=True)
-            if text.startswith('$') and text[1:].replace(',', '').isdigit():
-                price_elem = elem
-                break
-        
-        if not price_elem:
+        match = Parser.link_pattern.search(link['href'])
+        return f'{match.group(1)}_{match.group(2)}'
+
+    def parse(self, card) -> dict[str, str]:
+        """Parse the contents of one listing in a single traversal of the card's subtree."""
+        url = None
+        price = None
+        coordinates = {}
+        all_text = []
+
+        for node in card.descendants:
+            if type(node) is NavigableString:
+                text = node.strip()
+                if not text:
+                    continue
+                all_text.append(text)
+                # Price is the first span whose text looks like "$3,500"
+                if price is None and node.parent.name == 'span' and Parser.price_text_pattern.fullmatch(text):
+                    price = Parser.price_pattern.sub('', text)
+            elif getattr(node, 'attrs', None):
+                if url is None and node.name == 'a':
+                    # The first link to a unit page carries the listing URL (e.g., /building/foo-bar/123)
+                    href = node.get('href')
+                    if href and Parser.link_pattern.search(href):
+                        url = href
+                if len(coordinates) < 2:
+                    self.read_coordinates(node, coordinates)
+
+        if not url or price is None:
             return None
-        
-        price = Parser.price_pattern.sub('', price_elem.get_text())
-        
-        # Get all text from card
-        all_text = list(card.stripped_strings)
-        
+
+        match = Parser.link_pattern.search(url)
+        listing_id = f'{match.group(1)}_{match.group(2)}'
+
         # Find address (look for text with street/avenue and apartment number like "#4A")
         address = 'N/A'
         for text in all_text:
@@ -218,7 +501,7 @@ class Parser:
             if ('#' in text or any(word in text.lower() for word in ['street', 'avenue', 'road', 'st ', 'ave '])) and len(text) > 10 and len(text) < 80:
                 address = text
                 break
-        
+
         # If no address with # found, look for any address-like text
         if address == 'N/A':
             for text in all_text:
@@ -227,40 +510,50 @@ class Parser:
                 if any(word in text for word in ['East', 'West', 'North', 'South']) and any(char.isdigit() for char in text) and len(text) > 10 and len(text) < 80:
                     address = text
                     break
-        
+
         # Find neighborhood (usually appears after "in" in the text)
         neighborhood = 'N/A'
         full_text = ' '.join(all_text)
         neighborhood_match = re.search(r' in ([A-Z][^|$]+?)(?:\s+\d+|\||$)', full_text)
         if neighborhood_match:
             neighborhood = neighborhood_match.group(1).strip()
-        
+
         # Find listed by (broker/management company)
         listed_by = 'N/A'
         for i, text in enumerate(all_text):
             if text.lower() == 'listing by' and i + 1 < len(all_text):
                 listed_by = all_text[i + 1]
                 break
-        
-        # Detect if listing is featured (has "Featured" badge or special styling)
-        is_featured = False
-        if 'featured' in full_text.lower():
-            is_featured = True
-        # Also check for special badge elements that might indicate featured status
-        for elem in card.find_all(['span', 'div', 'p']):
-            if 'featured' in elem.get_text().lower():
-                is_featured = True
-                break
 
-        return {
+        # Detect if listing is featured - any "Featured" badge text ends up in the card's text
+        is_featured = 'featured' in full_text.lower()
+
+        listing = {
             'listing_id': listing_id,
-            'url': f"https://streeteasy.com{url}" if not url.startswith('http') else url,
+            # Card links may be absolute - either way, point them at the host being searched
+            'url': f"{get_base_url()}{urlsplit(url)._replace(scheme='', netloc='').geturl()}",
             'price': price,
             'address': address,
             'neighborhood': neighborhood,
             'listed_by': listed_by,
             'is_featured': is_featured,
         }
+        if len(coordinates) == 2:
+            listing.update(coordinates)
+        return listing
+
+    def read_coordinates(self, node, coordinates: dict) -> None:
+        """Collect a latitude or longitude exposed by a card element into `coordinates`."""
+        itemprop = node.get('itemprop')
+        for key, attrs in Parser.coordinate_attrs.items():
+            values = [node.get(attr) for attr in attrs]
+            if itemprop == key:
+                values.append(node.get('content'))
+            for value in values:
+                try:
+                    coordinates.setdefault(key, float(value))
+                except (TypeError, ValueError):
+                    continue
 
     def filter(self, target) -> bool:
         """Filter a listing based on attributes not captured by StreetEasy's interface natively."""
@@ -270,29 +563,64 @@ class Parser:
         # STRICT: Only allow listings from neighborhoods we're actually searching for
         # This prevents StreetEasy from including sponsored/similar listings from other areas
         searched_neighborhoods = self.kwargs.get('areas', [])
-        if searched_neighborhoods and target.get('neighborhood') not in searched_neighborhoods:
-            print(f"  Filtering out {target.get('address')} - {target.get('neighborhood')} (not in search areas)")
-            return False
-
-        for key, filter_values in Config.filters.items():
-            target_value = target.get(key, '')
-            
-            # Handle boolean filters (like is_featured)
-            if isinstance(target_value, bool):
-                if target_value in filter_values:
+        if searched_neighborhoods:
+            # Searched areas plus every area nested in them, e.g. "Stuyvesant Heights" within "Bedford-Stuyvesant"
+            within = expand_areas(tuple(searched_neighborhoods))
+            area_ids = self.located.get(target['listing_id'])
+            if area_ids:
+                # The listing's own coordinates settle it, whatever neighborhood its card text names. A point outside
+                # every polygon (e.g. on a boundary, or in an area missing from the index) falls back to the text.
+                if within.isdisjoint(area_ids):
+                    print(f"  Filtering out {target.get('address')} - {target.get('neighborhood')} (outside search areas)")
+                    self.rejected.append(target['listing_id'])
                     return False
-            # Handle string filters (like address, neighborhood, url)
             else:
-                if any(substring in str(target_value) for substring in filter_values):
+                neighborhood = target.get('neighborhood')
+                neighborhood_id = get_area_map().get(neighborhood)
+                if neighborhood_id:
+                    allowed = neighborhood_id in within
+                else:
+                    # A name missing from areas.json can only match a searched area literally
+                    allowed = neighborhood in searched_neighborhoods
+                if not allowed:
+                    print(f"  Filtering out {target.get('address')} - {neighborhood} (not in search areas)")
+                    self.rejected.append(target['listing_id'])
                     return False
 
+        rule = self.matcher.match(target)
+        if rule:
+            print(f"  Filtering out {target.get('address')} - {rule[0]} matches {rule[1]!r}")
+            # Flags such as `is_featured` describe how the listing is promoted right now, not the listing itself
+            if not isinstance(rule[1], bool):
+                self.rejected.append(target['listing_id'])
+            return False
+
         return True
 
-    @property
-    def listings(self) -> dict[str, str]:
+    @cached_property
+    def listings(self) -> list[dict[str, str]]:
         """Return all parsed and filtered listings."""
-        # Updated selector for new CSS modules-based class names
-        cards = self.soup.find_all('li', class_=re.compile(r'ListingCardsList_listCardWrapper'))
-        parsed = [self.parse(card) for card in cards if self.parse(card) is not None]
-        filtered = [card for card in parsed if self.filter(card)]
-        return filtered
+        if self.soup is None:
+            self.card_count = self.skipped_count = len(self.page_ids)
+            return []
+
+        start = time.perf_counter()
+        # The strainer leaves only the card wrappers at the top level of the tree
+        cards = self.soup.find_all('li', class_=Parser.card_pattern, recursive=False)
+        self.card_count = len(cards)
+        skipped = self.existing_ids | self.rejected_ids
+        unknown = [card for card in cards if self.listing_id(card) not in skipped]
+        self.skipped_count = len(cards) - len(unknown)
+        parsed = [listing for listing in map(self.parse, unknown) if listing is not None]
+        self.parse_time += time.perf_counter() - start
+
+        placed = [listing for listing in parsed if 'latitude' in listing]
+        if placed:
+            from .geo import get_area_geometry
+
+            points = [(listing['latitude'], listing['longitude']) for listing in placed]
+            areas = get_area_geometry().locate(points)
+            self.located = {listing['listing_id']: set(ids) for listing, ids in zip(placed, areas)}
+
+        # `filter` collects the listings to remember as rejected, so they don't count as new next run
+        return [card for card in parsed if self.filter(card)]
@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+from requests.cookies import create_cookie
+
+
+class SessionStore:
+    """Saves a session's cookies and header profile to disk so the next run continues as a returning visitor.
+
+    Attributes:
+        ttl (float): Seconds a saved session stays usable, shortened to the earliest expiry among its cookies.
+    """
+
+    ttl = 12 * 60 * 60
+
+    def __init__(self, path: str = None) -> None:
+        """Initialize the store.
+
+        Args:
+            path (str, optional): JSON file holding the session, defaulting to `data/session.json`.
+        """
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..', 'data')
+        self.path = path or os.path.join(data_dir, 'session.json')
+
+    def load(self, session) -> bool:
+        """Restore the saved headers and unexpired cookies into `session`.
+
+        Returns:
+            bool: Whether a saved session was restored. The session is left untouched if not.
+        """
+        try:
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        now = time.time()
+        if saved.get('expires_at', 0) <= now:
+            return False
+        cookies = [cookie for cookie in saved.get('cookies', []) if not cookie.get('expires') or cookie['expires'] > now]
+        if not cookies:
+            return False
+
+        session.headers.update(saved.get('headers', {}))
+        for cookie in cookies:
+            session.cookies.set_cookie(create_cookie(**cookie))
+        return True
+
+    def save(self, session) -> None:
+        """Write the session's headers and cookies, replacing any earlier save atomically."""
+        cookies = [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'expires': cookie.expires,
+                'secure': cookie.secure,
+            }
+            for cookie in session.cookies
+        ]
+        if not cookies:
+            return
+
+        now = time.time()
+        expiries = [cookie['expires'] for cookie in cookies if cookie['expires']]
+        saved = {
+            'saved_at': now,
+            'expires_at': min([now + SessionStore.ttl, *expiries]),
+            'headers': dict(session.headers),
+            'cookies': cookies,
+        }
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        # Cookies are credentials - keep them readable by the owner only
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(saved, f)
+        os.replace(temp_path, self.path)
+
+    def persist(self, session, blocked: bool = False) -> None:
+        """Save the session at the end of a run, or forget it if StreetEasy blocked it - fresh cookies beat flagged ones."""
+        if blocked:
+            session.cookies.clear()
+            self.clear()
+        else:
+            self.save(session)
+
+    def clear(self) -> None:
+        """Forget the saved session, e.g. after it was blocked."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
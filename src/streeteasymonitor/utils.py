@@ -1,10 +1,7 @@
 from datetime import datetime
-from dateutil.tz import gettz
-
-import json
 import os
 
-dir = os.path.dirname(os.path.abspath(__file__))
+from dateutil.tz import gettz
 
 
 def get_datetime() -> str:
@@ -17,13 +14,28 @@ def get_datetime() -> str:
 
 
 def get_area_map() -> dict[str, str]:
-    """Load StreetEasy's area name and ID mapping."""
-    with open(os.path.join(dir, 'data/areas.json'), 'r') as f:
-        areas = json.load(f)
-    return {area['name']: area['id'] for area in areas}
+    """Load StreetEasy's area name and ID mapping from the precompiled area index."""
+    from .areas import get_area_map
+
+    return get_area_map()
+
+
+def get_html_backend() -> str:
+    """Return the fastest Beautiful Soup tree builder available, falling back to the stdlib parser."""
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return 'html.parser'
+    return 'lxml'
+
+
+def get_base_url() -> str:
+    """Return the StreetEasy origin to send requests to, overridable with STREETEASY_BASE_URL (e.g. a local stand-in)."""
+    return os.environ.get('STREETEASY_BASE_URL', 'https://streeteasy.com').rstrip('/')
 
 
-def build_url(**kwargs) -> str:
-    """Construct search URL based on input parameters."""
+def build_url(page: int = 1, **kwargs) -> str:
+    """Construct search URL based on input parameters, optionally for a later results page."""
     q = '|'.join([f'{k}:{v}' for k, v in kwargs.items()])
-    return f'https://streeteasy.com/for-rent/nyc/{q}?sort_by=listed_desc'
+    url = f'{get_base_url()}/for-rent/nyc/{q}?sort_by=listed_desc'
+    return url if page <= 1 else f'{url}&page={page}'